@@ -0,0 +1 @@
+"""Benchmarks hors ligne du comparateur (rejeu des sources externes enregistrées)."""
@@ -0,0 +1,275 @@
+"""Test de charge : N sessions simultanées qui parcourent des pages de l'application.
+
+    python -m benchmarks.load --sessions 50 --rounds 2
+    python -m benchmarks.load --sessions 20 --journey marchés --latency 0.8 --rate-limit 60
+
+L'application tourne dans un vrai serveur Streamlit (sous-processus) où Yahoo Finance et
+Wikipedia sont rejoués en mémoire (`benchmarks.replay`) ; Groq et Alpha Vantage y sont
+appelés en HTTP sur les serveurs locaux de `benchmarks.standin`, démarrés ici. Chaque
+session est une connexion WebSocket qui envoie les mêmes messages que le navigateur :
+elle change de page dans la barre latérale et attend la fin de la réexécution.
+
+Le rapport donne les latences p50 / p99 des réexécutions (globales et par page), le
+débit, la croissance mémoire du serveur et les appels aux sources par session (lus sur
+son point `/metrics`).
+"""
+import argparse
+import asyncio
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from collections import defaultdict
+
+from .replay import Fixtures, replay
+from .run import APP, ROOT
+from .standin import OVERVIEW_PATH, StandIn, serve
+
+# Parcours scriptés : pages visitées dans l'ordre par une session
+JOURNEYS = {
+    "investisseur": ["Comparaison d'entreprises", "Le Cas du Jour", "Analyse IA", "Filtre d'actions"],
+    "marchés": ["Le marché du Jour", "Comparateur de marchés (2 marchés)", "Dans le futur..."],
+    "classement": ["Comparaison Globale", "Filtre d'actions", "Éducation financière"],
+}
+
+UPSTREAM_COUNT = re.compile(r'^comparateur_upstream_seconds_count\{provider="([^"]*)"[^}]*\} (\d+)$', re.M)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def rss_bytes(pid):
+    """Mémoire résidente du processus `pid` (Linux ; 0 ailleurs)."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def percentile(samples, q):
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def upstream_calls(metrics_url):
+    """Appels aux sources par fournisseur, d'après le point `/metrics` du serveur."""
+    try:
+        with urllib.request.urlopen(metrics_url, timeout=5) as response:
+            text = response.read().decode()
+    except OSError:
+        return {}
+    calls = defaultdict(int)
+    for provider, count in UPSTREAM_COUNT.findall(text):
+        calls[provider] += int(count)
+    return calls
+
+
+def app_server(port, fixtures_path=None):
+    """Point d'entrée du sous-processus : le serveur Streamlit avec les sources rejouées."""
+    from streamlit.web import bootstrap
+
+    fixtures = Fixtures.load(fixtures_path) if fixtures_path else Fixtures()
+    flags = {"server_port": port, "server_address": "127.0.0.1", "server_headless": True,
+             "browser_gatherUsageStats": False}
+    bootstrap.load_config_options(flags)
+    with replay(fixtures, http=False):
+        bootstrap.run(APP, False, [], flags)
+
+
+def start_app(fixtures_path, env, timeout=120):
+    """Lance le serveur de l'application ; renvoie (processus, port) une fois prêt."""
+    port = free_port()
+    command = [sys.executable, "-m", "benchmarks.load", "--app-server", str(port)]
+    if fixtures_path:
+        command += ["--fixtures", fixtures_path]
+    log = tempfile.TemporaryFile()
+    process = subprocess.Popen(command, cwd=ROOT, env={**os.environ, **env}, stdout=log, stderr=log)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            log.seek(0)
+            raise RuntimeError(f"Le serveur de l'application s'est arrêté : {log.read().decode()[-2000:]}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1):
+                return process, port
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("Le serveur de l'application n'a pas démarré à temps")
+
+
+async def rerun(ws, widgets=None):
+    """Réexécution du script ; renvoie (durée, identifiant du choix de page, première erreur)."""
+    from streamlit.proto.BackMsg_pb2 import BackMsg
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+    message = BackMsg()
+    message.rerun_script.query_string = ""
+    message.rerun_script.page_script_hash = ""
+    for widget_id, value in (widgets or {}).items():
+        state = message.rerun_script.widget_states.widgets.add()
+        state.id = widget_id
+        state.string_value = value
+    started = time.perf_counter()
+    await ws.send(message.SerializeToString())
+    radio, error = None, None
+    while True:
+        forward = ForwardMsg()
+        forward.ParseFromString(await ws.recv())
+        kind = forward.WhichOneof("type")
+        if kind == "script_finished":
+            # Une exécution interrompue par la nôtre (ouverture de session) ne compte pas
+            if forward.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                return time.perf_counter() - started, radio, error
+            continue
+        if kind != "delta" or forward.delta.WhichOneof("type") != "new_element":
+            continue
+        element = forward.delta.new_element
+        if element.WhichOneof("type") == "radio" and element.radio.id.endswith("-selected_tab"):
+            radio = element.radio.id
+        elif element.WhichOneof("type") == "exception" and error is None:
+            error = element.exception.message
+
+
+async def run_session(url, journey, rounds, timings, errors):
+    from websockets.asyncio.client import connect
+
+    async with connect(url, max_size=None, open_timeout=60) as ws:
+        _, radio, _ = await rerun(ws)
+        for _ in range(rounds):
+            for tab in journey:
+                seconds, _, error = await rerun(ws, {radio: tab})
+                timings.append((tab, seconds))
+                if error:
+                    errors.append((tab, error))
+
+
+async def _sessions(url, sessions, journeys, rounds, timings, errors, pid, rss):
+    async def sample():
+        while True:
+            rss.append(rss_bytes(pid))
+            await asyncio.sleep(0.2)
+
+    sampler = asyncio.create_task(sample())
+    names = list(journeys)
+    try:
+        await asyncio.gather(*(run_session(url, journeys[names[i % len(names)]], rounds, timings, errors)
+                               for i in range(sessions)))
+    finally:
+        sampler.cancel()
+    rss.append(rss_bytes(pid))
+
+
+def load_test(port, pid, metrics_url, sessions, journeys, rounds=1):
+    """Lance les sessions en parallèle contre le serveur ; renvoie les mesures du rapport."""
+    url = f"ws://127.0.0.1:{port}/_stcore/stream"
+    timings, errors, rss = [], [], []
+    calls_before, rss_before = upstream_calls(metrics_url), rss_bytes(pid)
+    started = time.perf_counter()
+    asyncio.run(_sessions(url, sessions, journeys, rounds, timings, errors, pid, rss))
+    elapsed = time.perf_counter() - started
+    calls_after = upstream_calls(metrics_url)
+    return {
+        "sessions": sessions,
+        "timings": timings,
+        "errors": errors,
+        "elapsed": elapsed,
+        "rss_growth": max(rss, default=rss_before) - rss_before,
+        "rss_final": rss[-1] - rss_before if rss else 0,
+        "calls": {provider: count - calls_before.get(provider, 0) for provider, count in calls_after.items()},
+    }
+
+
+def report(result, standin_stats=None):
+    durations = [seconds for _, seconds in result["timings"]]
+    sessions = result["sessions"]
+    lines = [
+        f"Sessions : {sessions}, réexécutions : {len(durations)} en {result['elapsed']:.1f} s "
+        f"({len(durations) / result['elapsed']:.1f} / s)",
+        f"Latence : p50 {percentile(durations, 50) * 1000:.0f} ms, p99 {percentile(durations, 99) * 1000:.0f} ms, "
+        f"max {max(durations, default=0) * 1000:.0f} ms",
+        f"Mémoire du serveur : pic {result['rss_growth'] / 2**20:+.1f} Mo "
+        f"({result['rss_growth'] / 2**20 / sessions:+.2f} Mo par session), fin {result['rss_final'] / 2**20:+.1f} Mo",
+        "",
+        "Par page :",
+    ]
+    by_tab = defaultdict(list)
+    for tab, seconds in result["timings"]:
+        by_tab[tab].append(seconds)
+    width = max((len(tab) for tab in by_tab), default=0)
+    for tab, samples in by_tab.items():
+        lines.append(f"  {tab:<{width}}  p50 {percentile(samples, 50) * 1000:7.0f} ms  "
+                     f"p99 {percentile(samples, 99) * 1000:7.0f} ms  (n={len(samples)})")
+    lines += ["", "Appels aux sources (total / par session) :"]
+    for provider, count in sorted(result["calls"].items()):
+        lines.append(f"  {provider:<14} {count:6d}  {count / sessions:8.1f}")
+    if standin_stats:
+        lines.append("Serveurs locaux : " + ", ".join(f"{name} {count}" for name, count in sorted(standin_stats.items())))
+    if result["errors"]:
+        lines.append(f"Erreurs : {len(result['errors'])} (première : {result['errors'][0][0]} : "
+                     f"{result['errors'][0][1]})")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Test de charge du comparateur.")
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=1, help="Passages de chaque session sur son parcours")
+    parser.add_argument("--journey", action="append", choices=list(JOURNEYS),
+                        help="Parcours à utiliser (défaut : tous, répartis entre les sessions)")
+    parser.add_argument("--warm", action="store_true", help="Remplit les caches (une session par parcours) avant")
+    parser.add_argument("--fixtures", help="Réponses enregistrées (défaut : réponses synthétiques)")
+    parser.add_argument("--latency", type=float, default=0.3, help="Latence Groq simulée (s)")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=int, help="Requêtes Groq par minute avant les 429")
+    parser.add_argument("--av-latency", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--app-server", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.app_server:
+        app_server(args.app_server, args.fixtures)
+        return 0
+
+    fixtures = Fixtures.load(args.fixtures) if args.fixtures else Fixtures()
+    standin = StandIn(fixtures, latency=args.latency, tokens_per_second=args.tokens_per_second,
+                      error_rate=args.error_rate, rate_limit=args.rate_limit, av_latency=args.av_latency,
+                      seed=args.seed)
+    server = serve(standin, port=0)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    metrics_port = free_port()
+    journeys = {name: JOURNEYS[name] for name in args.journey} if args.journey else JOURNEYS
+    process = None
+    try:
+        process, port = start_app(args.fixtures, {
+            "GROQ_BASE_URL": f"{base}/openai/v1",
+            "ALPHA_VANTAGE_BASE_URL": f"{base}{OVERVIEW_PATH}",
+            "METRICS_PORT": str(metrics_port),
+        })
+        metrics_url = f"http://127.0.0.1:{metrics_port}/metrics"
+        if args.warm:
+            load_test(port, process.pid, metrics_url, len(journeys), journeys)
+            standin.stats.clear()
+        result = load_test(port, process.pid, metrics_url, args.sessions, journeys, rounds=args.rounds)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+        server.shutdown()
+    print(report(result, dict(standin.stats)))
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,36 @@
+"""Enregistrement des réponses réelles des sources externes pour les benchmarks.
+
+    python -m benchmarks.record -o benchmarks/fixtures.json
+    python -m benchmarks.record -o benchmarks/fixtures.json --tab "Le Cas du Jour"
+
+Chaque page est affichée une fois avec les vrais clients réseau (clés `GROQ_API_KEY` et
+`ALPHA_VANTAGE_API_KEY` lues dans l'environnement) ; toutes leurs réponses sont ajoutées
+au fichier de sortie, que `python -m benchmarks.run --fixtures` rejoue ensuite hors ligne.
+"""
+import argparse
+import os
+import sys
+
+from .replay import Fixtures, recording, reset_state
+from .run import TABS, new_app, show_tab
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Enregistre les réponses des sources externes.")
+    parser.add_argument("-o", "--output", required=True, help="Fichier de fixtures (complété s'il existe)")
+    parser.add_argument("--tab", action="append", choices=TABS, help="Page à parcourir (défaut : toutes)")
+    args = parser.parse_args(argv)
+
+    fixtures = Fixtures.load(args.output) if os.path.exists(args.output) else Fixtures()
+    with recording(fixtures):
+        for tab in args.tab or TABS:
+            reset_state()
+            errors = show_tab(new_app(timeout=600), tab)
+            print(f"{tab} : {'erreur : ' + str(errors[0]) if errors else 'ok'}")
+    fixtures.save(args.output)
+    print(f"{sum(len(entries) for entries in fixtures.data.values())} réponses dans {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""Serveur local qui parle le protocole Redis, pour tester le cache partagé entre répliques.
+
+    python -m benchmarks.redis_standin --port 6390
+    CACHE_URL=redis://127.0.0.1:6390/0 CACHE_SECRET=local streamlit run app.py --server.port 8501
+    CACHE_URL=redis://127.0.0.1:6390/0 CACHE_SECRET=local streamlit run app.py --server.port 8502
+
+Seules les commandes utilisées par `comparateur.cache_backends` sont servies : PING,
+AUTH, SELECT, GET, SET (NX, EX, PX), DEL, EVAL (scripts de lecture avec prise du verrou
+et de libération des verrous), DBSIZE, FLUSHDB et INFO (compteurs de commandes).
+`--latency` ajoute un délai à chaque commande, comme un serveur distant.
+"""
+import argparse
+import socketserver
+import sys
+import threading
+import time
+from collections import Counter
+
+from comparateur.cache_backends import CLAIM_SCRIPT, RELEASE_SCRIPT
+
+
+class RedisStandIn:
+    """Données en mémoire avec expiration, et compteurs des commandes reçues."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.stats = Counter()
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key):
+        entry = self._data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+            del self._data[key]
+            return None
+        return entry
+
+    def execute(self, name, args):
+        """Réponse à une commande : valeur Python (bytes, str, int, None) ou exception."""
+        self.stats[name] += 1
+        with self._lock:
+            if name == "PING":
+                return "PONG"
+            if name in ("AUTH", "SELECT"):
+                return "OK"
+            if name == "GET":
+                entry = self._live(args[0])
+                return entry[0] if entry else None
+            if name == "SET":
+                return self._set(args)
+            if name == "DEL":
+                return sum(self._live(key) is not None and self._data.pop(key) is not None for key in args)
+            if name == "EVAL":
+                return self._eval(args[0].decode(), args[2:])
+            if name == "DBSIZE":
+                return sum(self._live(key) is not None for key in list(self._data))
+            if name == "FLUSHDB":
+                self._data.clear()
+                return "OK"
+            if name == "INFO":
+                return "".join(f"cmdstat_{command.lower()}:calls={count}\r\n"
+                               for command, count in sorted(self.stats.items())).encode()
+        raise ValueError(f"ERR commande inconnue '{name}'")
+
+    def _eval(self, script, args):
+        if script == CLAIM_SCRIPT:
+            key, lock, token, ttl = args
+            entry = self._live(key)
+            if entry:
+                return entry[0]
+            return 1 if self._set([lock, token, b"NX", b"PX", ttl]) else 0
+        if script == RELEASE_SCRIPT:
+            entry = self._live(args[0])
+            if entry and entry[0] == args[1]:
+                del self._data[args[0]]
+                return 1
+            return 0
+        raise ValueError("ERR script non pris en charge par le serveur local")
+
+    def _set(self, args):
+        key, value, options = args[0], args[1], [arg.decode().upper() for arg in args[2:]]
+        expires_at = None
+        if "EX" in options:
+            expires_at = time.monotonic() + int(options[options.index("EX") + 1])
+        if "PX" in options:
+            expires_at = time.monotonic() + int(options[options.index("PX") + 1]) / 1000
+        if "NX" in options and self._live(key) is not None:
+            return None
+        self._data[key] = (value, expires_at)
+        return "OK"
+
+
+def _reply(value):
+    if isinstance(value, Exception):
+        return f"-{value}\r\n".encode()
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, int):
+        return f":{value}\r\n".encode()
+    if isinstance(value, str):
+        return f"+{value}\r\n".encode()
+    return f"${len(value)}\r\n".encode() + value + b"\r\n"
+
+
+def _read_command(stream):
+    """Arguments d'une commande RESP (tableau de chaînes), ou None en fin de connexion."""
+    line = stream.readline()
+    if not line:
+        return None
+    if not line.startswith(b"*"):
+        return line.split()  # commande « inline » (ex. redis-cli, telnet)
+    args = []
+    for _ in range(int(line[1:])):
+        size = int(stream.readline()[1:])
+        args.append(stream.read(size + 2)[:-2])
+    return args
+
+
+def make_handler(standin):
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            while True:
+                command = _read_command(self.rfile)
+                if not command:
+                    return
+                time.sleep(standin.latency)
+                try:
+                    reply = standin.execute(command[0].decode().upper(), command[1:])
+                except Exception as e:
+                    reply = e if str(e).startswith("ERR") else ValueError(f"ERR {e}")
+                self.wfile.write(_reply(reply))
+
+    return Handler
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+def serve(standin, host="127.0.0.1", port=6390):
+    """Démarre le serveur dans un thread ; renvoie le serveur (`shutdown()` pour l'arrêter)."""
+    server = _Server((host, port), make_handler(standin))
+    threading.Thread(target=server.serve_forever, name="redis-standin", daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serveur local compatible Redis pour le cache partagé.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    parser.add_argument("--latency", type=float, default=0.0, help="Délai ajouté à chaque commande (s)")
+    args = parser.parse_args(argv)
+
+    standin = RedisStandIn(latency=args.latency)
+    server = serve(standin, args.host, args.port)
+    print(f"CACHE_URL=redis://{args.host}:{server.server_address[1]}/0")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
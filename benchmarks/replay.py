@@ -0,0 +1,509 @@
+"""Rejeu hors ligne des sources externes (Yahoo Finance, Alpha Vantage, Groq, Wikipedia).
+
+`replay(fixtures)` remplace les clients réseau (`yfinance.Ticker`, `yfinance.download`,
+`yahooquery.search`, `requests.get` / `requests.post`, `wikipedia.random` / `page`) par
+des réponses enregistrées, et le modèle de sentiment par `standin.SentimentStandIn` ; tout le reste (caches, disjoncteurs, métriques, pages) tourne
+normalement. `recording(fixtures)` fait l'inverse : il appelle les vrais clients et
+enregistre leurs réponses, pour produire un fichier de fixtures réutilisable.
+
+Une réponse absente du fichier est synthétisée de façon déterministe à partir du
+symbole ou du prompt (`Fixtures.synthesize`), si bien qu'un fichier partiel suffit.
+"""
+import contextlib
+import datetime
+import hashlib
+import io
+import json
+import os
+import re
+import zlib
+from collections import Counter
+from unittest import mock
+
+from comparateur import breaker, cache
+from comparateur.providers import alpha_vantage_url, groq_chat_url
+
+KINDS = ("info", "history", "news", "financials", "balance_sheet", "cash_flow", "search", "overview", "chat",
+         "wikipedia")
+PRICE_FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+SYNTHETIC_YEARS = 12
+
+SECTORS = [
+    ("Technology", "Software - Infrastructure"),
+    ("Technology", "Semiconductors"),
+    ("Healthcare", "Drug Manufacturers - General"),
+    ("Financial Services", "Banks - Diversified"),
+    ("Consumer Cyclical", "Auto Manufacturers"),
+    ("Energy", "Oil & Gas Integrated"),
+    ("Industrials", "Aerospace & Defense"),
+    ("Consumer Defensive", "Household & Personal Products"),
+]
+
+
+def _seed(text):
+    return zlib.crc32(str(text).encode())
+
+
+def _prompt_key(prompt):
+    return hashlib.md5(prompt.encode()).hexdigest()
+
+
+class Fixtures:
+    """Réponses des sources externes, indexées par type puis par symbole, requête ou prompt."""
+
+    def __init__(self, data=None, synthesize=True):
+        self.data = {kind: dict((data or {}).get(kind, {})) for kind in KINDS}
+        self.synthesize = synthesize
+        # Réponses servies par synthèse faute d'enregistrement, par type
+        self.misses = Counter()
+        self._generated = {}
+
+    @classmethod
+    def load(cls, path, synthesize=True):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f), synthesize=synthesize)
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False)
+
+    def _lookup(self, kind, key, synthesize):
+        if key in self.data[kind]:
+            return self.data[kind][key]
+        if not self.synthesize:
+            raise KeyError(f"Pas de réponse enregistrée ({kind}) pour {key}")
+        self.misses[kind] += 1
+        if (kind, key) not in self._generated:
+            self._generated[kind, key] = synthesize(key)
+        return self._generated[kind, key]
+
+    # --- Accès utilisés par le rejeu ---
+
+    def info(self, ticker):
+        return self._lookup("info", ticker, synthetic_info)
+
+    def _frame(self, kind, key, synthesize):
+        import pandas as pd
+
+        stored = self._lookup(kind, key, synthesize)
+        if not isinstance(stored, str):
+            return stored
+        # Tableau enregistré : décodé une seule fois
+        if (kind, key) not in self._generated:
+            self._generated[kind, key] = pd.read_json(io.StringIO(stored), orient="split")
+        return self._generated[kind, key]
+
+    def history(self, ticker):
+        return self._frame("history", ticker, synthetic_history)
+
+    def news(self, ticker):
+        return self._lookup("news", ticker, synthetic_news)
+
+    def financials(self, ticker):
+        return self._frame("financials", ticker, synthetic_financials)
+
+    def balance_sheet(self, ticker):
+        return self._frame("balance_sheet", ticker, synthetic_balance_sheet)
+
+    def cash_flow(self, ticker):
+        return self._frame("cash_flow", ticker, synthetic_cash_flow)
+
+    def search(self, query):
+        return self._lookup("search", query, synthetic_search)
+
+    def overview(self, symbol):
+        return self._lookup("overview", symbol, lambda key: synthetic_overview(key, self.info(key)))
+
+    def chat(self, prompt, json_mode=False):
+        return self._lookup("chat", _prompt_key(prompt), lambda key: synthetic_chat(prompt, json_mode))
+
+    def wikipedia(self, key):
+        return self._lookup("wikipedia", key, synthetic_wikipedia)
+
+    # --- Enregistrement ---
+
+    def store(self, kind, key, value):
+        import pandas as pd
+
+        if isinstance(value, pd.DataFrame):
+            value = value.to_json(orient="split", date_format="iso")
+        self.data[kind][key] = value
+        self._generated.pop((kind, key), None)
+
+
+# --- Réponses synthétiques déterministes ---
+
+def synthetic_info(ticker):
+    import numpy as np
+
+    rng = np.random.default_rng(_seed(ticker))
+    sector, industry = SECTORS[_seed(ticker) % len(SECTORS)]
+    revenue = float(10 ** rng.uniform(8.5, 11.5))
+    margin = float(rng.uniform(-0.05, 0.35))
+    price = float(rng.uniform(10, 500))
+    shares = float(10 ** rng.uniform(7.5, 10))
+    equity = revenue * float(rng.uniform(0.2, 1.5))
+    return {
+        "symbol": ticker, "quoteType": "EQUITY", "shortName": f"{ticker} Corp", "longName": f"{ticker} Corporation",
+        "sector": sector, "industry": industry, "country": "United States", "currency": "USD",
+        "longBusinessSummary": f"{ticker} Corporation opère dans le secteur {sector} ({industry}).",
+        "fullTimeEmployees": int(rng.integers(500, 200000)),
+        "currentPrice": price, "regularMarketPrice": price,
+        "regularMarketChangePercent": float(rng.normal(0, 1.5)),
+        "regularMarketVolume": int(rng.integers(10**5, 10**8)),
+        "marketCap": price * shares, "totalRevenue": revenue, "netIncomeToCommon": revenue * margin,
+        "profitMargins": margin, "grossMargins": float(rng.uniform(0.2, 0.8)),
+        "operatingMargins": float(rng.uniform(-0.05, 0.45)),
+        "revenueGrowth": float(rng.normal(0.08, 0.12)), "earningsGrowth": float(rng.normal(0.1, 0.3)),
+        "returnOnEquity": float(rng.normal(0.15, 0.12)), "trailingPE": float(rng.uniform(5, 60)),
+        "trailingEps": price / float(rng.uniform(5, 60)), "debtToEquity": float(rng.uniform(0, 250)),
+        "currentRatio": float(rng.uniform(0.5, 3)), "dividendYield": float(rng.uniform(0, 0.05)),
+        "assetTurnover": float(rng.uniform(0.2, 1.5)), "totalDebt": equity * float(rng.uniform(0, 2)),
+        "totalStockholdersEquity": equity, "freeCashflow": revenue * float(rng.uniform(-0.05, 0.25)),
+    }
+
+
+def synthetic_history(ticker):
+    import numpy as np
+    import pandas as pd
+
+    end = pd.Timestamp(datetime.date.today())
+    index = pd.bdate_range(end - pd.DateOffset(years=SYNTHETIC_YEARS), end, tz="America/New_York")
+    rng = np.random.default_rng(_seed(ticker))
+    close = 100 * np.cumprod(1 + rng.normal(0.0003, 0.012, len(index)))
+    spread = close * rng.uniform(0.002, 0.02, len(index))
+    return pd.DataFrame({
+        "Open": close + rng.normal(0, 0.5, len(index)) * spread,
+        "High": close + spread,
+        "Low": close - spread,
+        "Close": close,
+        "Volume": rng.integers(10**5, 10**7, len(index)).astype(float),
+    }, index=index)
+
+
+def synthetic_news(ticker):
+    return [{"content": {"title": f"{ticker} publie ses résultats trimestriels",
+                         "summary": f"Le chiffre d'affaires de {ticker} progresse sur un an."}}]
+
+
+def _fiscal_years():
+    import pandas as pd
+
+    return [pd.Timestamp(datetime.date.today().year - i, 12, 31) for i in range(1, 5)]
+
+
+def synthetic_financials(ticker):
+    import pandas as pd
+
+    info = synthetic_info(ticker)
+    revenue, income = info["totalRevenue"], info["netIncomeToCommon"]
+    return pd.DataFrame({year: [revenue * 0.93 ** i, income * 0.9 ** i] for i, year in enumerate(_fiscal_years())},
+                        index=["Total Revenue", "Net Income"])
+
+
+def synthetic_balance_sheet(ticker):
+    import pandas as pd
+
+    info = synthetic_info(ticker)
+    debt, equity = info["totalDebt"], info["marketCap"] / 4
+    return pd.DataFrame({year: [debt * 0.95 ** i, equity * 0.92 ** i, (debt + equity) * 0.94 ** i]
+                         for i, year in enumerate(_fiscal_years())},
+                        index=["Total Debt", "Stockholders Equity", "Total Assets"])
+
+
+def synthetic_cash_flow(ticker):
+    import pandas as pd
+
+    info = synthetic_info(ticker)
+    free_cash_flow = info["freeCashflow"]
+    return pd.DataFrame({year: [free_cash_flow * 1.2 * 0.9 ** i, free_cash_flow * 0.9 ** i]
+                         for i, year in enumerate(_fiscal_years())},
+                        index=["Operating Cash Flow", "Free Cash Flow"])
+
+
+def synthetic_search(query):
+    symbol = re.sub(r"[^A-Z0-9]", "", query.upper())[:5] or "ACME"
+    return {"quotes": [{"symbol": symbol, "shortname": f"{symbol} Corp"},
+                       {"symbol": f"{symbol}.PA", "shortname": f"{symbol} SA"}]}
+
+
+def synthetic_overview(symbol, info):
+    return {
+        "Symbol": symbol,
+        "MarketCapitalization": str(info.get("marketCap", 0)),
+        "RevenueTTM": str(info.get("totalRevenue", 0)),
+        "NetIncomeTTM": str(info.get("netIncomeToCommon", 0)),
+    }
+
+
+def synthetic_chat(prompt, json_mode=False):
+    if json_mode:
+        symbols = re.findall(r"^Symbole : (\S+)$", prompt, flags=re.MULTILINE)
+        return json.dumps({"analyses": [{"symbole": symbol, "analyse": f"Analyse simulée de {symbol}."}
+                                        for symbol in symbols]})
+    return "Analyse simulée. " * 60
+
+
+def synthetic_wikipedia(key):
+    return {"title": "Ratio cours/bénéfice", "categories": ["Finance d'entreprise"]}
+
+
+# --- Clients remplacés ---
+
+def _slice_history(hist, period=None, start=None, end=None, **_):
+    """Sous-période d'un historique complet, selon les arguments de `Ticker.history`."""
+    import pandas as pd
+
+    if hist.empty:
+        return hist
+    last = hist.index[-1]
+    if start is not None or end is not None:
+        tz = hist.index.tz
+        start = pd.Timestamp(start).tz_localize(tz) if start is not None and pd.Timestamp(start).tz is None \
+            else start
+        end = pd.Timestamp(end).tz_localize(tz) if end is not None and pd.Timestamp(end).tz is None else end
+        return hist.loc[start:end]
+    if period in (None, "max"):
+        return hist
+    if period == "ytd":
+        return hist[hist.index.year == last.year]
+    match = re.fullmatch(r"(\d+)(d|wk|mo|y)", period)
+    if not match:
+        return hist
+    count, unit = int(match.group(1)), match.group(2)
+    offset = {"d": pd.DateOffset(days=count), "wk": pd.DateOffset(weeks=count),
+              "mo": pd.DateOffset(months=count), "y": pd.DateOffset(years=count)}[unit]
+    return hist[hist.index > last - offset]
+
+
+class _Response:
+    def __init__(self, payload, status_code=200):
+        self.payload = payload
+        self.status_code = status_code
+        self.text = json.dumps(payload)
+
+    def json(self):
+        return self.payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            import requests
+
+            raise requests.HTTPError(f"{self.status_code}", response=self)
+
+
+def _replay_clients(fixtures):
+    """Remplaçants des clients réseau qui lisent `fixtures`."""
+    import pandas as pd
+
+    class Ticker:
+        def __init__(self, symbol):
+            self.ticker = symbol
+
+        @property
+        def info(self):
+            return fixtures.info(self.ticker)
+
+        @property
+        def news(self):
+            return fixtures.news(self.ticker)
+
+        @property
+        def financials(self):
+            return fixtures.financials(self.ticker)
+
+        income_stmt = financials
+
+        @property
+        def balance_sheet(self):
+            return fixtures.balance_sheet(self.ticker)
+
+        @property
+        def cashflow(self):
+            return fixtures.cash_flow(self.ticker)
+
+        def history(self, **kwargs):
+            return _slice_history(fixtures.history(self.ticker), **kwargs)
+
+    def download(tickers, group_by="ticker", **kwargs):
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        frames = {ticker: Ticker(ticker).history(**kwargs) for ticker in tickers}
+        if len(tickers) == 1:
+            return frames[tickers[0]]
+        return pd.concat(frames, axis=1)
+
+    def get(url, *args, **kwargs):
+        if url.startswith(alpha_vantage_url()):
+            symbol = re.search(r"symbol=([^&]+)", url).group(1)
+            return _Response(fixtures.overview(symbol))
+        raise ConnectionError(f"Rejeu hors ligne : pas de réponse pour {url}")
+
+    def post(url, *args, json=None, **kwargs):
+        if url == groq_chat_url():
+            prompt = json["messages"][-1]["content"]
+            content = fixtures.chat(prompt, json_mode="response_format" in json)
+            return _Response({"choices": [{"message": {"role": "assistant", "content": content}}]})
+        raise ConnectionError(f"Rejeu hors ligne : pas de réponse pour {url}")
+
+    class Page:
+        def __init__(self, title):
+            stored = fixtures.wikipedia(title)
+            self.title = stored["title"]
+            self.categories = stored["categories"]
+
+    return {
+        "yfinance.Ticker": Ticker,
+        "yfinance.download": download,
+        "yahooquery.search": fixtures.search,
+        "requests.get": get,
+        "requests.post": post,
+        "wikipedia.random": lambda pages=1: fixtures.wikipedia("random")["title"],
+        "wikipedia.page": Page,
+        "wikipedia.set_lang": lambda lang: None,
+    }
+
+
+def _recording_clients(fixtures):
+    """Vrais clients réseau dont chaque réponse est enregistrée dans `fixtures`."""
+    import requests
+    import wikipedia
+    import yahooquery
+    import yfinance as yf
+
+    real_ticker = yf.Ticker
+    real_get, real_post = requests.get, requests.post
+    real_search, real_random, real_page = yahooquery.search, wikipedia.random, wikipedia.page
+
+    class Ticker(real_ticker):
+        @property
+        def info(self):
+            value = super().info
+            fixtures.store("info", self.ticker, value)
+            return value
+
+        @property
+        def news(self):
+            value = super().news
+            fixtures.store("news", self.ticker, value)
+            return value
+
+        @property
+        def financials(self):
+            value = super().financials
+            fixtures.store("financials", self.ticker, value)
+            return value
+
+        income_stmt = financials
+
+        @property
+        def balance_sheet(self):
+            value = super().balance_sheet
+            fixtures.store("balance_sheet", self.ticker, value)
+            return value
+
+        @property
+        def cashflow(self):
+            value = super().cashflow
+            fixtures.store("cash_flow", self.ticker, value)
+            return value
+
+        def history(self, *args, **kwargs):
+            value = super().history(*args, **kwargs)
+            previous = fixtures.data["history"].get(self.ticker)
+            # On garde l'historique le plus long : les périodes plus courtes en sont extraites
+            if previous is None or len(value) > len(fixtures.history(self.ticker)):
+                fixtures.store("history", self.ticker, value[[f for f in PRICE_FIELDS if f in value]])
+            return value
+
+    def download(tickers, *args, **kwargs):
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        # Un appel par ticker pour enregistrer chaque historique séparément
+        frames = {ticker: Ticker(ticker).history(**{k: v for k, v in kwargs.items()
+                                                     if k not in ("group_by", "progress", "threads")})
+                  for ticker in tickers}
+        import pandas as pd
+
+        return frames[tickers[0]] if len(tickers) == 1 else pd.concat(frames, axis=1)
+
+    def get(url, *args, **kwargs):
+        response = real_get(url, *args, **kwargs)
+        if url.startswith(alpha_vantage_url()) and response.status_code == 200:
+            fixtures.store("overview", re.search(r"symbol=([^&]+)", url).group(1), response.json())
+        return response
+
+    def post(url, *args, json=None, **kwargs):
+        response = real_post(url, *args, json=json, **kwargs)
+        if url == groq_chat_url() and response.status_code == 200:
+            fixtures.store("chat", _prompt_key(json["messages"][-1]["content"]),
+                           response.json()["choices"][0]["message"]["content"])
+        return response
+
+    def search(query, *args, **kwargs):
+        value = real_search(query, *args, **kwargs)
+        fixtures.store("search", query, value)
+        return value
+
+    def random_page(pages=1):
+        title = real_random(pages=pages)
+        fixtures.store("wikipedia", "random", {"title": title, "categories": []})
+        return title
+
+    def page(title, *args, **kwargs):
+        value = real_page(title, *args, **kwargs)
+        fixtures.store("wikipedia", title, {"title": value.title, "categories": list(value.categories)})
+        fixtures.store("wikipedia", "random", {"title": value.title, "categories": list(value.categories)})
+        return value
+
+    return {
+        "yfinance.Ticker": Ticker,
+        "yfinance.download": download,
+        "yahooquery.search": search,
+        "requests.get": get,
+        "requests.post": post,
+        "wikipedia.random": random_page,
+        "wikipedia.page": page,
+    }
+
+
+def reset_state():
+    """Vide les caches et referme les disjoncteurs (mesures à froid)."""
+    for entry in cache.CACHES:
+        entry.clear()
+    for source in breaker.BREAKERS:
+        source.record_success()
+
+
+@contextlib.contextmanager
+def _patched(clients, env):
+    with contextlib.ExitStack() as stack:
+        for target, replacement in clients.items():
+            stack.enter_context(mock.patch(target, replacement))
+        stack.enter_context(mock.patch.dict(os.environ, env))
+        yield
+
+
+def replay(fixtures, http=True):
+    """Contexte dans lequel toutes les sources externes répondent depuis `fixtures`.
+
+    Avec `http=False`, Alpha Vantage et Groq restent appelés en HTTP, par exemple vers
+    les serveurs locaux de `benchmarks.standin` (`GROQ_BASE_URL`, `ALPHA_VANTAGE_BASE_URL`).
+    """
+    from .standin import SentimentStandIn
+
+    clients = _replay_clients(fixtures)
+    # Le modèle FinBERT n'est ni téléchargé ni mesuré
+    model = SentimentStandIn()
+    clients["comparateur.sentiment.get_sentiment_model"] = lambda: model
+    if not http:
+        del clients["requests.get"], clients["requests.post"]
+    # Clés factices : les chemins Alpha Vantage et Groq sont exercés comme en production
+    # Comptes annuels et scores de sentiment en mémoire seulement : `reset_state` suffit à repartir à froid
+    env = {"ALPHA_VANTAGE_API_KEY": "replay", "GROQ_API_KEY": "replay", "LLM_BACKEND": "groq",
+           "STATEMENTS_DIR": "", "SENTIMENT_STORE": ""}
+    return _patched(clients, env)
+
+
+def recording(fixtures):
+    """Contexte dans lequel les vrais clients répondent et leurs réponses sont enregistrées."""
+    return _patched(_recording_clients(fixtures), {})
@@ -0,0 +1,230 @@
+"""Benchmarks hors ligne : chaque page de l'application et les fonctions de calcul.
+
+    python -m benchmarks.run                                  # réponses synthétiques
+    python -m benchmarks.run --fixtures benchmarks/fixtures.json
+    python -m benchmarks.run --save-baseline                  # nouvelle référence
+    python -m benchmarks.run --only "fonction:" --repeat 20
+
+Les pages sont affichées sans navigateur avec `streamlit.testing.v1.AppTest`, caches
+vides (`froid`) puis remplis (`chaud`), pendant que `benchmarks.replay` sert toutes les
+réponses des sources externes. La comparaison d'entreprises est mesurée jusqu'au résultat
+(tickers saisis, bouton « Comparer » cliqué). Chaque mesure est la médiane de `--repeat`
+exécutions ; elle est comparée à la référence enregistrée (`benchmarks/baseline.json`) et
+le code de sortie vaut 1 si une page échoue ou si une mesure dépasse sa référence de plus
+de `--tolerance`.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+from .replay import Fixtures, replay, reset_state
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "app.py")
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Pages de la barre latérale de app.py
+TABS = [
+    "Comparaison d'entreprises",
+    "Analyse IA",
+    "Comparaison Globale",
+    "Filtre d'actions",
+    "Le Cas du Jour",
+    "Le marché du Jour",
+    "Comparateur de marchés (2 marchés)",
+    "Dans le futur...",
+    "Éducation financière",
+]
+
+# En dessous de cet écart absolu (secondes), une différence est du bruit de mesure
+MIN_REGRESSION = 0.002
+
+
+def new_app(timeout=120):
+    """Application prête à être affichée sans navigateur (première page déjà rendue)."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP, default_timeout=timeout)
+    at.run()
+    return at
+
+
+# Tickers saisis par le scénario de la comparaison d'entreprises
+COMPARED_TICKERS = "AAPL, MSFT, GOOGL"
+
+
+def _errors(at):
+    """Messages des exceptions levées par la page et des erreurs qu'elle affiche."""
+    return [exception.value for exception in at.exception] + [error.value for error in at.error]
+
+
+def show_tab(at, tab):
+    """Affiche la page `tab` ; renvoie les messages d'erreur de la page."""
+    at.sidebar.radio(key="selected_tab").set_value(tab).run()
+    return _errors(at)
+
+
+def compare_companies(at):
+    """Saisit des tickers et lance la comparaison d'entreprises ; renvoie les messages d'erreur."""
+    at.text_input(key="extra_tickers").set_value(COMPARED_TICKERS)
+    next(button for button in at.button if button.label.startswith("📊 Comparer")).click().run()
+    return _errors(at)
+
+
+# Action à mesurer après l'ouverture d'une page (et à chaque affichage à chaud) ; les
+# autres pages sont simplement réaffichées
+SCENARIOS = {"Comparaison d'entreprises": compare_companies}
+
+
+def _rerun(at):
+    at.run()
+    return _errors(at)
+
+
+def _median(samples):
+    return statistics.median(samples) if samples else float("nan")
+
+
+def app_benchmarks(tabs, repeat):
+    """Durées médianes d'affichage de chaque page, caches vides puis caches remplis."""
+    results, failures = {}, {}
+    for tab in tabs:
+        cold, warm = [], []
+        action = SCENARIOS.get(tab)
+        for _ in range(repeat):
+            at = new_app()
+            reset_state()
+            started = time.perf_counter()
+            errors = show_tab(at, tab)
+            if action is not None:
+                errors += action(at)
+            cold.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            errors += (action or _rerun)(at)
+            warm.append(time.perf_counter() - started)
+            if errors:
+                failures[tab] = errors
+        results[f"page:{tab}:froid"] = _median(cold)
+        results[f"page:{tab}:chaud"] = _median(warm)
+    return results, failures
+
+
+def function_benchmarks(fixtures, repeat):
+    """Durées médianes des notes, indicateurs et calculs de tableaux sur les fixtures."""
+    from comparateur.charts import downsample
+    from comparateur.comparison import PricePanel, comparison_frame
+    from comparateur.market import calculate_rsi
+    from comparateur.peers import CompetitorIndex
+    from comparateur.scoring import assess_investment_potential, build_company_row, score_financier
+    from comparateur.screener import Screener, fundamentals_table
+    from comparateur.sectors import returns_frame
+    from comparateur.universe import SECTOR_ETFS, all_tickers
+
+    tickers = all_tickers()[:500]
+    infos = {ticker: fixtures.info(ticker) for ticker in tickers}
+    history = fixtures.history(tickers[0])["Close"]
+    panel = PricePanel.from_histories({sector: fixtures.history(etf) for sector, etf in SECTOR_ETFS.items()}).closes
+    screener = Screener(fundamentals_table(infos))
+    index = CompetitorIndex(infos)
+    silent = lambda message: None  # noqa: E731
+
+    cases = {
+        "fonction:score_financier": lambda: [score_financier(info, warn=silent) for info in infos.values()],
+        "fonction:assess_investment_potential":
+            lambda: [assess_investment_potential(info, warn=silent) for info in infos.values()],
+        "fonction:build_company_row":
+            lambda: [build_company_row(ticker, info, warn=silent) for ticker, info in infos.items()],
+        "fonction:calculate_rsi": lambda: calculate_rsi(history),
+        "fonction:comparison_frame": lambda: comparison_frame(dict(list(infos.items())[:5])),
+        "fonction:returns_frame": lambda: returns_frame(panel),
+        "fonction:downsample": lambda: downsample(history, 500),
+        "fonction:Screener": lambda: Screener(fundamentals_table(infos)),
+        "fonction:Screener.screen": lambda: screener.screen("pe < 25 and roe > 0.1", sort_by="roe", top=20),
+        "fonction:CompetitorIndex": lambda: CompetitorIndex(infos),
+        "fonction:CompetitorIndex.nearest": lambda: index.nearest(tickers[0], k=5),
+    }
+    results = {}
+    for name, case in cases.items():
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            case()
+            samples.append(time.perf_counter() - started)
+        results[name] = _median(samples)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Lignes du rapport (nom, mesure, référence, écart relatif, régression)."""
+    rows = []
+    for name, seconds in results.items():
+        reference = baseline.get(name)
+        delta = (seconds - reference) / reference if reference else None
+        regression = (reference is not None and seconds > reference * (1 + tolerance)
+                      and seconds - reference > MIN_REGRESSION)
+        rows.append((name, seconds, reference, delta, regression))
+    return rows
+
+
+def report(rows):
+    width = max(len(name) for name, *_ in rows)
+    lines = [f"{'Mesure':<{width}}  {'ms':>10}  {'référence':>10}  {'écart':>8}"]
+    for name, seconds, reference, delta, regression in rows:
+        reference_text = f"{reference * 1000:10.2f}" if reference is not None else f"{'-':>10}"
+        delta_text = f"{delta:+8.1%}" if delta is not None else f"{'-':>8}"
+        lines.append(f"{name:<{width}}  {seconds * 1000:10.2f}  {reference_text}  {delta_text}"
+                     + ("  RÉGRESSION" if regression else ""))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks hors ligne du comparateur.")
+    parser.add_argument("--fixtures", help="Fichier de réponses enregistrées (défaut : réponses synthétiques)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Fichier de référence")
+    parser.add_argument("--save-baseline", action="store_true", help="Enregistre les mesures comme référence")
+    parser.add_argument("--repeat", type=int, default=3, help="Exécutions par mesure (médiane)")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Hausse relative tolérée")
+    parser.add_argument("--only", help="Ne lance que les mesures dont le nom contient ce texte")
+    args = parser.parse_args(argv)
+
+    def wanted(*names):
+        return not args.only or any(args.only in name for name in names)
+
+    fixtures = Fixtures.load(args.fixtures) if args.fixtures else Fixtures()
+    tabs = [tab for tab in TABS if wanted(f"page:{tab}:froid", f"page:{tab}:chaud")]
+    results, failures = {}, {}
+    with replay(fixtures):
+        if not (args.only or "").startswith("page:"):
+            results.update(function_benchmarks(fixtures, args.repeat))
+        if tabs:
+            pages, failures = app_benchmarks(tabs, args.repeat)
+            results.update(pages)
+    results = {name: seconds for name, seconds in results.items() if wanted(name)}
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    rows = compare(results, baseline, args.tolerance)
+    print(report(rows))
+    if fixtures.misses:
+        print("Réponses synthétisées : " + ", ".join(f"{kind} {count}" for kind, count in fixtures.misses.items()))
+    for tab, errors in failures.items():
+        print(f"Erreur sur la page {tab} : {errors[0]}", file=sys.stderr)
+    if failures:
+        # Une page en erreur s'affiche vite : ses mesures ne valent ni référence ni succès
+        return 1
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({**baseline, **results}, f, ensure_ascii=False, indent=2, sort_keys=True)
+        print(f"Référence enregistrée dans {args.baseline}")
+        return 0
+    return 1 if any(regression for *_, regression in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+"""Serveurs locaux qui imitent Groq (API compatible OpenAI) et Alpha Vantage (OVERVIEW).
+
+    python -m benchmarks.standin --port 8787 --latency 0.4 --tokens-per-second 250 \\
+        --error-rate 0.02 --rate-limit 30
+    GROQ_BASE_URL=http://127.0.0.1:8787/openai/v1 \\
+    ALPHA_VANTAGE_BASE_URL=http://127.0.0.1:8787/query \\
+    GROQ_API_KEY=local ALPHA_VANTAGE_API_KEY=local streamlit run app.py
+
+- `POST /openai/v1/chat/completions` : réponse complète, ou flux SSE avec `"stream": true`.
+  Chaque réponse attend `--latency` secondes puis le temps de « générer » ses jetons à
+  `--tokens-per-second` ; `--error-rate` renvoie des 500 et `--rate-limit` (requêtes par
+  minute) des 429 avec `Retry-After`, comme Groq.
+- `GET /query?function=OVERVIEW&symbol=...` : données fondamentales, après
+  `--av-latency` secondes ; au-delà de `--av-quota` requêtes, la réponse est la note de
+  quota qu'Alpha Vantage renvoie avec un statut 200.
+- `GET /stats` : nombre de requêtes, d'erreurs et de 429 servis, en JSON.
+
+Les contenus viennent de `benchmarks.replay.Fixtures` (fichier `--fixtures`, sinon
+réponses synthétiques) ; `--seed` rend les erreurs aléatoires reproductibles.
+
+`SentimentStandIn` remplace le modèle FinBERT de `comparateur.sentiment` (sans
+téléchargement ni inférence) ; `benchmarks.replay.replay` l'installe avec les autres sources.
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import zlib
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from .replay import Fixtures
+
+CHAT_PATH = "/openai/v1/chat/completions"
+OVERVIEW_PATH = "/query"
+QUOTA_NOTE = ("Thank you for using Alpha Vantage! Our standard API call frequency is 5 calls per minute "
+              "and 25 calls per day.")
+
+
+class SentimentStandIn:
+    """Modèle de sentiment instantané : score déterministe de chaque texte, entre -1 et 1."""
+
+    def score(self, texts):
+        return [zlib.crc32(text.encode()) % 2001 / 1000 - 1 for text in texts]
+
+
+class StandIn:
+    """Comportement des deux services : latence, débit, erreurs, limites et compteurs."""
+
+    def __init__(self, fixtures=None, latency=0.3, tokens_per_second=200.0, error_rate=0.0,
+                 rate_limit=None, av_latency=0.1, av_quota=None, seed=None):
+        self.fixtures = fixtures or Fixtures()
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.av_latency = av_latency
+        self.av_quota = av_quota
+        self.stats = Counter()
+        self._random = random.Random(seed)
+        self._requests = deque()
+        self._lock = threading.Lock()
+
+    def count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def rate_limited(self):
+        """Vrai (et secondes avant la prochaine place) si la limite par minute est atteinte."""
+        if not self.rate_limit:
+            return False, 0.0
+        now = time.monotonic()
+        with self._lock:
+            while self._requests and now - self._requests[0] >= 60:
+                self._requests.popleft()
+            if len(self._requests) >= self.rate_limit:
+                return True, 60 - (now - self._requests[0])
+            self._requests.append(now)
+        return False, 0.0
+
+    def fails(self):
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+    def quota_exceeded(self):
+        with self._lock:
+            self.stats["av_requests"] += 1
+            return self.av_quota is not None and self.stats["av_requests"] > self.av_quota
+
+    def completion(self, payload):
+        prompt = payload["messages"][-1]["content"]
+        return self.fixtures.chat(prompt, json_mode="response_format" in payload)
+
+
+def _tokens(text):
+    """Découpage grossier en jetons (mots et espaces) pour simuler le débit et le flux."""
+    words = text.split(" ")
+    return [word + (" " if i < len(words) - 1 else "") for i, word in enumerate(words)]
+
+
+def make_handler(standin):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _json(self, status, body, headers=None):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/stats":
+                with standin._lock:
+                    self._json(200, dict(standin.stats))
+                return
+            if url.path != OVERVIEW_PATH:
+                self._json(404, {"error": "not found"})
+                return
+            query = {key: values[0] for key, values in parse_qs(url.query).items()}
+            time.sleep(standin.av_latency)
+            if standin.quota_exceeded():
+                standin.count("av_quota")
+                self._json(200, {"Note": QUOTA_NOTE})
+                return
+            if query.get("function") != "OVERVIEW" or not query.get("symbol"):
+                self._json(200, {"Error Message": "Invalid API call."})
+                return
+            self._json(200, standin.fixtures.overview(query["symbol"]))
+
+        def do_POST(self):
+            if urlparse(self.path).path != CHAT_PATH:
+                self._json(404, {"error": {"message": "not found"}})
+                return
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+            standin.count("chat_requests")
+            limited, retry_after = standin.rate_limited()
+            if limited:
+                standin.count("chat_429")
+                self._json(429, {"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}},
+                           {"Retry-After": f"{retry_after:.0f}"})
+                return
+            time.sleep(standin.latency)
+            if standin.fails():
+                standin.count("chat_errors")
+                self._json(500, {"error": {"message": "Internal server error", "type": "internal_error"}})
+                return
+            tokens = _tokens(standin.completion(payload))
+            delay = 1 / standin.tokens_per_second if standin.tokens_per_second else 0
+            created = int(time.time())
+            model = payload.get("model", "standin")
+            if payload.get("stream"):
+                self._stream(tokens, delay, created, model)
+                return
+            time.sleep(delay * len(tokens))
+            self._json(200, {
+                "id": f"chatcmpl-standin-{created}", "object": "chat.completion", "created": created,
+                "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": "".join(tokens)}}],
+                "usage": {"prompt_tokens": len(_tokens(payload["messages"][-1]["content"])),
+                          "completion_tokens": len(tokens)},
+            })
+
+        def _stream(self, tokens, delay, created, model):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            base = {"id": f"chatcmpl-standin-{created}", "object": "chat.completion.chunk",
+                    "created": created, "model": model}
+            chunks = [{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}]
+            chunks += [{"index": 0, "delta": {"content": token}, "finish_reason": None} for token in tokens]
+            chunks.append({"index": 0, "delta": {}, "finish_reason": "stop"})
+            for choice in chunks:
+                self.wfile.write(f"data: {json.dumps({**base, 'choices': [choice]})}\n\n".encode())
+                self.wfile.flush()
+                time.sleep(delay)
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+
+    return Handler
+
+
+def serve(standin, host="127.0.0.1", port=8787):
+    """Démarre le serveur dans un thread ; renvoie le serveur (`shutdown()` pour l'arrêter)."""
+    server = ThreadingHTTPServer((host, port), make_handler(standin))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="standin", daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serveurs locaux Groq et Alpha Vantage.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--fixtures", help="Réponses enregistrées (défaut : réponses synthétiques)")
+    parser.add_argument("--latency", type=float, default=0.3, help="Délai avant le premier jeton (s)")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Part de réponses 500")
+    parser.add_argument("--rate-limit", type=int, help="Requêtes de chat par minute avant les 429")
+    parser.add_argument("--av-latency", type=float, default=0.1, help="Délai des réponses Alpha Vantage (s)")
+    parser.add_argument("--av-quota", type=int, help="Requêtes Alpha Vantage servies avant la note de quota")
+    parser.add_argument("--seed", type=int, help="Graine des erreurs aléatoires")
+    args = parser.parse_args(argv)
+
+    standin = StandIn(
+        Fixtures.load(args.fixtures) if args.fixtures else None,
+        latency=args.latency, tokens_per_second=args.tokens_per_second, error_rate=args.error_rate,
+        rate_limit=args.rate_limit, av_latency=args.av_latency, av_quota=args.av_quota, seed=args.seed,
+    )
+    server = serve(standin, args.host, args.port)
+    base = f"http://{args.host}:{server.server_address[1]}"
+    print(f"GROQ_BASE_URL={base}/openai/v1")
+    print(f"ALPHA_VANTAGE_BASE_URL={base}{OVERVIEW_PATH}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
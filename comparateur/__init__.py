@@ -0,0 +1,58 @@
+"""Cœur du comparateur : données, notes et analyses, sans dépendance à Streamlit.
+
+`import comparateur` n'importe que la bibliothèque standard ; yfinance, requests,
+pandas, etc. ne sont chargés qu'au premier appel qui en a besoin.
+"""
+from .analysis import (
+    AI_ANALYSIS_CACHE,
+    explain_financial_concept,
+    get_ai_analysis,
+    get_ai_market_advice,
+    get_ai_rankings_analysis,
+)
+from .breaker import ProviderUnavailable, open_breakers
+from .budget import LatencyBudget, page_budget
+from .comparison import (
+    PricePanel,
+    comparison_frame,
+    comparison_graph,
+    company_labels,
+    history_panel,
+    parse_tickers,
+)
+from .divergence import compare_field, divergence_alerts
+from .formatting import format_currency
+from .llm import cached_chat, chat, chat_async, chat_batch, llm_available, llm_backend
+from .market import calculate_rsi, get_market_data
+from .peers import find_competitors
+from .providers import (
+    GroqError,
+    SymbolNotFoundError,
+    fetch_all,
+    fetch_financials,
+    fetch_histories,
+    fetch_history,
+    fetch_info,
+    fetch_news,
+    get_alpha_vantage_overview,
+    get_daily_financial_concept,
+    groq_chat,
+    search_ticker,
+)
+from .scoring import assess_investment_potential, build_company_row, score_financier
+from .screener import stock_screener
+from .sectors import sector_performance
+from .statements import fetch_statement, fetch_statements
+from .taskgraph import TaskGraph
+from .universe import (
+    COMPANIES_BY_COUNTRY,
+    COUNTRY_FLAGS,
+    COUNTRY_LABELS_FR,
+    COUNTRY_TO_COMPANIES,
+    MARKET_INDEXES,
+    SECTOR_ETFS,
+    TOP_10_COUNTRIES,
+    UNIVERSE,
+    all_tickers,
+    normalize_symbol,
+)
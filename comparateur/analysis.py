@@ -0,0 +1,213 @@
+"""Analyses rédigées par l'IA (Groq ou modèle local) : prompts et appels mis en cache."""
+import hashlib
+import json
+
+from .cache import AI_ANALYSES
+from .formatting import format_currency
+from .llm import chat, chat_batch, llm_available, llm_backend
+from .providers import GroqError
+
+MISSING_KEY_MESSAGE = "Clé API Groq non trouvée."
+
+# Analyses par entreprise et type de classement (partagées entre répliques avec CACHE_URL)
+AI_ANALYSIS_CACHE = AI_ANALYSES
+
+
+def company_facts(info):
+    """Bloc de données clés d'une entreprise, commun aux prompts d'analyse."""
+    return f"""Secteur : {info.get('sector', 'N/A')}
+Industrie : {info.get('industry', 'N/A')}
+Prix actuel : {info.get('currentPrice', 'N/A')} USD
+Capitalisation boursière : {format_currency(info.get('marketCap'))} USD
+Chiffre d'affaires annuel : {format_currency(info.get('totalRevenue'))} USD
+Bénéfice net : {format_currency(info.get('netIncomeToCommon'))} USD
+Bénéfice par action (EPS) : {info.get('trailingEps', 'N/A')}
+Ratio P/E : {info.get('trailingPE', 'N/A')}
+ROE : {info.get('returnOnEquity', 'N/A')}
+Dette totale : {format_currency(info.get('totalDebt'))} USD
+Flux de trésorerie libre : {format_currency(info.get('freeCashflow'))} USD"""
+
+
+def ranking_prompt(company_name, info, ranking_type):
+    return f"""Tu es un expert financier. Analyse les entreprises suivantes pour le classement "{ranking_type}".
+Entreprise : {company_name}
+{company_facts(info)}
+
+Explique pourquoi cette entreprise est bien classée pour "{ranking_type}" en français, de façon concise et professionnelle."""
+
+
+def case_prompt(company_name, ticker, info):
+    return f"""Tu es un expert financier. Analyse en détail l'entreprise suivante pour déterminer si c'est un bon investissement aujourd'hui.
+Entreprise : {company_name}
+Symbole : {ticker}
+{company_facts(info)}
+
+Analyse les points forts et les points faibles de l'entreprise, et donne une conclusion claire sur si c'est une bonne entreprise pour investir aujourd'hui, en français, de façon concise et professionnelle."""
+
+
+def comparison_prompt(infos):
+    """Prompt de comparaison de plusieurs entreprises (dict ticker -> info)."""
+    companies = "ces deux entreprises" if len(infos) == 2 else f"ces {len(infos)} entreprises"
+    blocks = "\n".join(
+        f"""Entreprise {i} : {info.get('shortName', ticker)} :
+- Secteur : {info.get('sector')}
+- Industrie : {info.get('industry')}
+- Prix actuel : {info.get('currentPrice')} USD
+- Capitalisation boursière : {format_currency(info.get('marketCap'))} USD
+- Chiffre d'affaires annuel : {format_currency(info.get('totalRevenue'))} USD
+- Bénéfice net : {format_currency(info.get('netIncomeToCommon'))} USD
+- EPS : {info.get('trailingEps')}
+- Ratio P/E : {info.get('trailingPE')}
+- ROE : {info.get('returnOnEquity')}
+- Dette totale : {format_currency(info.get('totalDebt'))} USD
+- Flux de trésorerie libre : {format_currency(info.get('freeCashflow'))} USD"""
+        for i, (ticker, info) in enumerate(infos.items(), start=1)
+    )
+    return f"""Tu es un expert financier. Compare {companies} afin d'aider un investisseur à choisir la plus intéressante aujourd'hui. Analyse les points suivants : secteur, industrie, prix actuel, capitalisation boursière, chiffre d'affaires annuel, bénéfice net, bénéfice par action (EPS), ratio P/E, retour sur fonds propres (ROE), dette totale, flux de trésorerie libre. Donne aussi ton avis sur leur santé financière globale en utilisant des notes sur 10 que tu imagines.
+{blocks}
+En te basant sur ces données, indique laquelle de {companies} semble la plus prometteuse pour un investissement aujourd'hui et explique pourquoi, en français, de façon claire, concise et professionnelle."""
+
+
+def ranking_table_prompt(companies, ranking_type):
+    """Prompt unique pour tout un classement ; la réponse attendue est un objet JSON."""
+    blocks = "\n\n".join(
+        f"""Entreprise : {company_name}
+Symbole : {ticker}
+{company_facts(info)}"""
+        for company_name, ticker, info in companies
+    )
+    return f"""Tu es un expert financier. Analyse les entreprises suivantes pour le classement "{ranking_type}".
+
+{blocks}
+
+Pour chaque entreprise, explique pourquoi elle est bien classée pour "{ranking_type}" en français, de façon concise et professionnelle.
+Réponds uniquement avec un objet JSON de la forme {{"analyses": [{{"symbole": "<symbole>", "analyse": "<texte>"}}]}}, avec une entrée par entreprise."""
+
+
+def _analysis_cache_key(company_name, info, ranking_type):
+    # Create a hash of the company name, financial info, and ranking type to use as a cache key
+    return hashlib.md5((company_name + str(info) + ranking_type).encode()).hexdigest()
+
+
+def get_ai_analysis(company_name, info, ranking_type):
+    """Gets an AI analysis for a given company and ranking type, using a cache for consistency."""
+    if not llm_available("ranking"):
+        return MISSING_KEY_MESSAGE
+
+    cache_key = _analysis_cache_key(company_name, info, ranking_type)
+
+    cached = AI_ANALYSIS_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
+    try:
+        # Set temperature to 0 for consistent results
+        ai_response = chat(ranking_prompt(company_name, info, ranking_type), temperature=0.0,
+                           max_tokens=500, feature="ranking")
+    except GroqError as e:
+        return str(e)
+    except Exception as e:
+        return f"Erreur : {e}"
+    AI_ANALYSIS_CACHE.set(cache_key, ai_response)
+    return ai_response
+
+
+def get_ai_rankings_analysis(companies, ranking_type, max_tokens_per_company=400):
+    """Analyses IA de tout un classement en une seule requête.
+
+    `companies` est une liste de (nom, ticker, info). Les analyses sont mises en cache
+    par entreprise, avec la même clé que `get_ai_analysis` ; seules les entreprises
+    absentes du cache sont envoyées. Celles que la réponse JSON ne couvre pas sont
+    analysées individuellement ; si la requête elle-même échoue (limite de débit, source
+    indisponible), toutes reçoivent le message d'erreur. Avec le modèle local, les prompts individuels sont
+    générés en un seul lot. Renvoie un dict ticker -> analyse.
+    """
+    if not llm_available("ranking"):
+        return {ticker: MISSING_KEY_MESSAGE for _, ticker, _ in companies}
+
+    analyses = {}
+    missing = []
+    for company_name, ticker, info in companies:
+        cached = AI_ANALYSIS_CACHE.get(_analysis_cache_key(company_name, info, ranking_type))
+        if cached is not None:
+            analyses[ticker] = cached
+        else:
+            missing.append((company_name, ticker, info))
+
+    if missing and llm_backend("ranking") == "local":
+        try:
+            texts = chat_batch([ranking_prompt(*company) for company in missing], temperature=0.0,
+                               max_tokens=max_tokens_per_company, feature="ranking")
+        except Exception as e:
+            return {**analyses, **{ticker: f"Erreur : {e}" for _, ticker, _ in missing}}
+        for (company_name, ticker, info), text in zip(missing, texts):
+            AI_ANALYSIS_CACHE.set(_analysis_cache_key(company_name, info, ranking_type), text)
+            analyses[ticker] = text
+    elif missing:
+        try:
+            content = chat(ranking_table_prompt(missing, ranking_type), temperature=0.0,
+                           max_tokens=max_tokens_per_company * len(missing), feature="ranking",
+                           json_mode=True)
+        except Exception as e:
+            # 429, disjoncteur ouvert, erreur Groq : une requête par entreprise aggraverait la limitation
+            error = str(e) if isinstance(e, GroqError) else f"Erreur : {e}"
+            return {**analyses, **{ticker: error for _, ticker, _ in missing}}
+        try:
+            parsed = json.loads(content)
+        except json.JSONDecodeError:
+            parsed = {}
+        entries = parsed.get("analyses", []) if isinstance(parsed, dict) else []
+        # JSON inexploitable ou sections manquantes : repli sur une requête par entreprise
+        sections = {
+            str(entry.get("symbole", "")).upper(): entry.get("analyse")
+            for entry in entries if isinstance(entry, dict)
+        } if isinstance(entries, list) else {}
+        for company_name, ticker, info in missing:
+            text = sections.get(ticker.upper())
+            if isinstance(text, str) and text.strip():
+                AI_ANALYSIS_CACHE.set(_analysis_cache_key(company_name, info, ranking_type), text)
+                analyses[ticker] = text
+            else:
+                analyses[ticker] = get_ai_analysis(company_name, info, ranking_type)
+    return analyses
+
+
+def get_ai_market_advice(market_df):
+    if not llm_available("market_advice"):
+        return MISSING_KEY_MESSAGE
+    # Conversion du DataFrame en markdown ou texte simple si tabulate n'est pas dispo
+    try:
+        table_str = market_df.to_markdown(index=False)
+    except ImportError:
+        table_str = market_df.to_string(index=False)
+    prompt = (
+        "Tu es un expert en marchés financiers. Voici les performances récentes de plusieurs indices boursiers :\n"
+        f"{table_str}\n"
+        "En te basant sur ces données, conseille sur quel marché il serait le plus intéressant d'investir actuellement et explique pourquoi, en français, de façon concise et professionnelle."
+    )
+    try:
+        return chat(prompt, temperature=0.5, max_tokens=500, feature="market_advice")
+    except GroqError as e:
+        return str(e)
+    except Exception as e:
+        return f"Erreur : {e}"
+
+
+def explain_financial_concept(concept):
+    """Utilise l'IA pour expliquer le concept financier du jour."""
+    if not llm_available("concept"):
+        return "Clé API Groq non trouvée. Veuillez configurer la clé API dans les paramètres."
+
+    prompt = f"""Tu es un expert en finance et en économie. Explique le concept suivant de manière claire et concise,
+    adaptée à un public novice en finance. Inclus également un exemple concret pour illustrer le concept.
+
+    Concept du jour : {concept}
+
+    Explique en français, de façon pédagogique et accessible."""
+
+    try:
+        return chat(prompt, temperature=0.7, max_tokens=1000, feature="concept")
+    except GroqError as e:
+        return str(e)
+    except Exception as e:
+        return f"Erreur : {e}"
@@ -0,0 +1,111 @@
+"""Comparaison en lot d'une liste de tickers, sans interface.
+
+    python -m comparateur.batch tickers.txt -o screen.csv --workers 16
+
+Le fichier d'entrée contient un ticker par ligne (les virgules et les lignes
+commençant par `#` sont acceptées). Les fondamentaux, historiques et données
+Alpha Vantage sont récupérés en parallèle via les caches partagés de
+`comparateur.cache`. La sortie est écrite en CSV ou en Parquet selon l'extension.
+"""
+import argparse
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .divergence import divergent_fields
+from .providers import fetch_history, fetch_info, get_alpha_vantage_overview
+from .scoring import build_company_row
+
+logger = logging.getLogger(__name__)
+
+
+def read_tickers(path):
+    """Lit un fichier de tickers et renvoie la liste dédoublonnée, dans l'ordre."""
+    tickers = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0]
+            for token in line.replace(",", " ").split():
+                tickers.append(token.strip().upper())
+    return list(dict.fromkeys(tickers))
+
+
+def history_metrics(hist):
+    """Performance et volatilité annualisée sur l'historique fourni."""
+    if hist is None or hist.empty or len(hist) < 2:
+        return {"Performance (%)": None, "Volatilité annualisée (%)": None}
+    close = hist["Close"]
+    return {
+        "Performance (%)": ((close.iloc[-1] / close.iloc[0]) - 1) * 100,
+        "Volatilité annualisée (%)": close.pct_change().std() * (252 ** 0.5) * 100,
+    }
+
+
+def analyze_ticker(ticker, history_period="1y", alpha_vantage=True):
+    """Note, potentiel, divergences Alpha Vantage et métriques de cours pour un ticker."""
+    info = fetch_info(ticker)
+    row = build_company_row(ticker, info)
+    row["Capitalisation (brute)"] = info.get("marketCap")
+    row.update(history_metrics(fetch_history(ticker, period=history_period)))
+    if alpha_vantage:
+        av_info = get_alpha_vantage_overview(ticker)
+        row["Alpha Vantage"] = av_info is not None
+        row["Divergences"] = ", ".join(label for _, _, label in divergent_fields(info, av_info or {}))
+    row["Erreur"] = None
+    return row
+
+
+def run_batch(tickers, workers=16, history_period="1y", alpha_vantage=True):
+    """Analyse tous les tickers en parallèle ; renvoie un DataFrame dans l'ordre d'entrée."""
+    import pandas as pd
+
+    rows = {}
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(analyze_ticker, ticker, history_period, alpha_vantage): ticker
+            for ticker in tickers
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            ticker = futures[future]
+            try:
+                rows[ticker] = future.result()
+            except Exception as e:
+                logger.warning("Échec pour %s : %s", ticker, e)
+                rows[ticker] = {"Symbole": ticker, "Erreur": str(e)}
+            if done % 50 == 0 or done == len(futures):
+                logger.info("%d/%d tickers traités (%.1fs)", done, len(futures), time.monotonic() - started)
+    return pd.DataFrame([rows[ticker] for ticker in tickers])
+
+
+def write_output(df, path):
+    if path.endswith(".parquet"):
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Comparaison en lot d'une liste de tickers.")
+    parser.add_argument("tickers_file", help="fichier contenant un ticker par ligne")
+    parser.add_argument("-o", "--output", default="screen.csv", help="fichier de sortie (.csv ou .parquet)")
+    parser.add_argument("-w", "--workers", type=int, default=16, help="nombre de requêtes simultanées")
+    parser.add_argument("--period", default="1y", help="période de l'historique de cours (ex. 6mo, 1y, 5y)")
+    parser.add_argument("--no-alpha-vantage", action="store_true", help="ne pas vérifier les divergences Alpha Vantage")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    tickers = read_tickers(args.tickers_file)
+    if not tickers:
+        parser.error(f"aucun ticker dans {args.tickers_file}")
+    df = run_batch(tickers, workers=args.workers, history_period=args.period,
+                   alpha_vantage=not args.no_alpha_vantage)
+    write_output(df, args.output)
+    failed = df["Erreur"].notna().sum()
+    logger.info("%d lignes écrites dans %s (%d échecs)", len(df), args.output, failed)
+    return 1 if failed == len(df) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
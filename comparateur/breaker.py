@@ -0,0 +1,121 @@
+"""Disjoncteurs par source de données externe (Yahoo Finance, Alpha Vantage, Groq).
+
+Après `failure_threshold` échecs consécutifs, le disjoncteur s'ouvre : les appels
+suivants échouent immédiatement avec `ProviderUnavailable` au lieu d'attendre chacun
+leur propre délai d'expiration. Passé `reset_timeout` secondes, un seul appel de test
+est autorisé ; s'il réussit, le disjoncteur se referme. Pendant ce temps, les
+fournisseurs servent les dernières données en cache (voir `TTLCache.get_stale`).
+"""
+import threading
+import time
+
+CLOSED = "fermé"
+OPEN = "ouvert"
+HALF_OPEN = "semi-ouvert"
+
+
+class ProviderUnavailable(Exception):
+    """Source de données considérée comme indisponible (disjoncteur ouvert)."""
+
+    def __init__(self, provider, retry_in):
+        super().__init__(f"{provider} est momentanément indisponible (nouvel essai dans {retry_in:.0f} s).")
+        self.provider = provider
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Disjoncteur thread-safe : fermé, ouvert après des échecs répétés, puis semi-ouvert pour un test."""
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=60):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self.last_error = None
+        # Âge (s) de la plus ancienne donnée en cache servie depuis l'ouverture
+        self.stale_age = 0.0
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return HALF_OPEN
+        return OPEN
+
+    def retry_in(self):
+        """Secondes avant le prochain appel de test (0 si le disjoncteur est fermé)."""
+        with self._lock:
+            return self._retry_in()
+
+    def _retry_in(self):
+        if self._opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def call(self, fn, *args, is_failure=None, **kwargs):
+        """Appelle `fn(*args, **kwargs)` à travers le disjoncteur.
+
+        `is_failure(exception)` décide si une exception compte comme une panne de la
+        source (par défaut : toutes) ; une réponse métier comme un symbole inconnu ne
+        doit pas ouvrir le disjoncteur.
+        """
+        with self._lock:
+            state = self._state()
+            if state == OPEN or (state == HALF_OPEN and self._probing):
+                raise ProviderUnavailable(self.name, self._retry_in())
+            probing = state == HALF_OPEN
+            if probing:
+                self._probing = True
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            if is_failure is None or is_failure(e):
+                self.record_failure(e)
+            elif probing:
+                self.record_success()
+            raise
+        finally:
+            if probing:
+                with self._lock:
+                    self._probing = False
+        self.record_success()
+        return result
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self.last_error = None
+            self.stale_age = 0.0
+
+    def record_failure(self, error=None):
+        with self._lock:
+            self._failures += 1
+            self.last_error = error
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                # Échec pendant un test : on repart pour un délai complet
+                self._opened_at = time.monotonic()
+
+    def served_stale(self, age):
+        with self._lock:
+            self.stale_age = max(self.stale_age, age)
+
+
+YAHOO = CircuitBreaker("Yahoo Finance")
+ALPHA_VANTAGE = CircuitBreaker("Alpha Vantage", failure_threshold=3, reset_timeout=300)
+GROQ = CircuitBreaker("Groq", failure_threshold=3, reset_timeout=60)
+
+BREAKERS = [YAHOO, ALPHA_VANTAGE, GROQ]
+
+
+def open_breakers():
+    """Disjoncteurs actuellement ouverts ou en attente d'un appel de test."""
+    return [breaker for breaker in BREAKERS if breaker.state != CLOSED]
@@ -0,0 +1,74 @@
+"""Budgets de latence par page et exécution en arrière-plan des sections lentes.
+
+Une page démarre un `LatencyBudget`, lance ses appels lents avec `submit`, affiche
+tout de suite ce qui est prêt, puis attend chaque section optionnelle au plus le temps
+restant. Une tâche qui dépasse le budget n'est pas annulée : elle se termine en
+arrière-plan et son résultat (mis en cache par la fonction appelée) sert au prochain
+affichage. Le budget d'une page se règle avec `PAGE_BUDGET_<PAGE>` (en secondes).
+
+Les appels d'IA (jusqu'à 60 s chez Groq, plus encore en local) passent par `submit_llm`,
+un pool séparé et borné (`LLM_WORKERS`, 4 par défaut) : quelques réponses lentes ne
+bloquent pas les téléchargements des autres utilisateurs.
+"""
+import contextvars
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+# Budgets par défaut (secondes)
+PAGE_BUDGETS = {
+    "comparison": 8.0,
+    "case": 10.0,
+    "market": 10.0,
+    "markets": 10.0,
+    "ranking": 15.0,
+}
+DEFAULT_BUDGET = 10.0
+
+_BACKGROUND = ThreadPoolExecutor(max_workers=8, thread_name_prefix="comparateur-bg")
+_LLM = ThreadPoolExecutor(max_workers=int(os.getenv("LLM_WORKERS", "4")), thread_name_prefix="comparateur-llm")
+
+
+def submit(fn, *args, **kwargs):
+    """Lance `fn(*args, **kwargs)` sur le pool partagé d'arrière-plan ; renvoie un `Future`.
+
+    La tâche s'exécute dans une copie du contexte de l'appelant (page en cours pour les métriques).
+    """
+    return _BACKGROUND.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def submit_llm(fn, *args, **kwargs):
+    """Comme `submit`, sur le pool réservé aux appels d'IA."""
+    return _LLM.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def page_budget(page):
+    """Budget de latence d'une page, en secondes."""
+    value = os.getenv(f"PAGE_BUDGET_{page.upper()}")
+    return float(value) if value else PAGE_BUDGETS.get(page, DEFAULT_BUDGET)
+
+
+class LatencyBudget:
+    """Temps restant pour afficher une page."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.started_at = time.monotonic()
+
+    def elapsed(self):
+        return time.monotonic() - self.started_at
+
+    def remaining(self):
+        return max(0.0, self.seconds - self.elapsed())
+
+    def wait(self, future, default=None):
+        """Résultat de `future` s'il arrive avant la fin du budget, sinon `default`.
+
+        Les exceptions de la tâche sont relancées ; la tâche trop lente continue en
+        arrière-plan.
+        """
+        try:
+            return future.result(timeout=self.remaining())
+        except FutureTimeout:
+            return default
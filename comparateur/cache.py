@@ -0,0 +1,298 @@
+"""Caches mémoire partagés entre les pages Streamlit, les scripts batch et les threads.
+
+Les caches créés avec `shared=True` sont aussi partagés entre répliques quand
+`CACHE_URL` désigne un stockage (voir `cache_backends`). Leurs valeurs y sont écrites
+signées (HMAC-SHA256 avec `CACHE_SECRET`) : une valeur dont la signature ne correspond
+pas n'est jamais désérialisée.
+"""
+import hashlib
+import hmac
+import logging
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from .cache_backends import get_backend
+from .metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class _Flight:
+    """Calcul en cours d'une clé : les threads qui attendent reçoivent son résultat ou son erreur."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = _MISSING
+        self.error = None
+
+
+# Durée de vie d'un verrou de calcul entre répliques
+LOCK_TTL = 60
+# Attente maximale du résultat d'une autre réplique avant de calculer soi-même, et
+# intervalle entre deux essais (doublé à chaque essai jusqu'à LOCK_POLL_MAX)
+CLAIM_WAIT = 3.0
+LOCK_POLL = 0.05
+LOCK_POLL_MAX = 0.5
+SIGNATURE_SIZE = hashlib.sha256().digest_size
+
+
+def _sign(secret, data):
+    return hmac.new(secret, data, hashlib.sha256).digest() + data
+
+
+def _verify(secret, data):
+    """Contenu signé de `data`, ou None si la signature ne correspond pas."""
+    signature, payload = data[:SIGNATURE_SIZE], data[SIGNATURE_SIZE:]
+    if not hmac.compare_digest(signature, hmac.new(secret, payload, hashlib.sha256).digest()):
+        return None
+    return payload
+
+
+class TTLCache:
+    """Cache thread-safe avec expiration, taille bornée (LRU) et calcul unique par clé.
+
+    `get_or_compute` garantit qu'une clé absente n'est calculée qu'une seule fois même si
+    plusieurs threads la demandent en même temps : les autres attendent le résultat, ou
+    reçoivent la même exception si le calcul échoue.
+    Avec `shared=True` et un stockage partagé, une clé absente localement est cherchée
+    dans le stockage et, si elle y manque aussi, verrouillée en un seul aller-retour : le
+    calcul unique s'étend aux autres répliques.
+    """
+
+    def __init__(self, name, ttl, maxsize=2048, shared=False):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.shared = shared
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+    def _get_local(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            # L'entrée expirée reste disponible pour `get_stale` jusqu'à son éviction
+            if entry is None or entry[0] < time.monotonic():
+                return _MISSING
+            self._data.move_to_end(key)
+            return entry[2]
+
+    def get(self, key, default=None):
+        value = self._get_local(key)
+        if value is not _MISSING:
+            record_cache(self.name, True)
+            return value
+        value = self._get_shared(key)
+        if value is not _MISSING:
+            record_cache(self.name, True, shared=True)
+            return value
+        record_cache(self.name, False)
+        return default
+
+    def peek(self, key, default=None):
+        """Valeur locale encore valable, sans métrique ni stockage partagé (filtres en masse)."""
+        value = self._get_local(key)
+        return default if value is _MISSING else value
+
+    def get_stale(self, key, default=None):
+        """Dernière valeur connue, même expirée, et son âge en secondes : (valeur, âge).
+
+        Sert au mode dégradé quand la source est indisponible ; renvoie `default` si
+        la clé n'a jamais été mise en cache (ou a été évincée).
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            _, stored_at, value = entry
+            return value, time.monotonic() - stored_at
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        self._store(key, value, ttl)
+        backend = self._backend()
+        if backend is not None:
+            try:
+                data = pickle.dumps((time.time() + ttl, time.time(), value), pickle.HIGHEST_PROTOCOL)
+            except Exception as e:
+                logger.warning("Valeur non partageable dans le cache %s : %s", self.name, e)
+                return
+            backend.set(self._shared_key(key), _sign(backend.secret, data), ttl)
+
+    def _store(self, key, value, ttl, age=0.0):
+        now = time.monotonic()
+        with self._lock:
+            self._data[key] = (now + ttl, now - age, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def _backend(self):
+        return get_backend() if self.shared else None
+
+    def _shared_key(self, key):
+        return f"{self.name}:{key!r}"
+
+    def _get_shared(self, key):
+        """Valeur du stockage partagé (recopiée localement pour sa durée restante), sinon `_MISSING`."""
+        backend = self._backend()
+        data = backend.get(self._shared_key(key)) if backend is not None else None
+        if data is None:
+            return _MISSING
+        return self._load_shared(backend, key, data)
+
+    def _load_shared(self, backend, key, data):
+        """Valeur signée lue dans le stockage, recopiée localement ; `_MISSING` si invalide ou expirée."""
+        payload = _verify(backend.secret, data)
+        if payload is None:
+            logger.warning("Signature invalide pour %s dans le cache partagé : valeur ignorée",
+                           self._shared_key(key))
+            return _MISSING
+        try:
+            expires_at, stored_at, value = pickle.loads(payload)
+        except Exception:
+            return _MISSING
+        now = time.time()
+        if expires_at <= now:
+            return _MISSING
+        self._store(key, value, expires_at - now, age=max(0.0, now - stored_at))
+        return value
+
+    def _claim_shared(self, backend, key):
+        """Valeur publiée par une autre réplique, ou verrou pour la calculer : (valeur, jeton).
+
+        Un aller-retour par essai (`backend.claim`), espacés de plus en plus. Tant qu'une
+        autre réplique détient le verrou, attend son résultat au plus `CLAIM_WAIT` secondes ;
+        renvoie (`_MISSING`, None) si elle n'a rien publié à temps (réplique lente ou
+        arrêtée : on calcule localement), ou si la valeur publiée est invalide.
+        """
+        deadline = time.monotonic() + CLAIM_WAIT
+        poll = LOCK_POLL
+        while True:
+            data, token = backend.claim(self._shared_key(key), LOCK_TTL)
+            if data is not None:
+                return self._load_shared(backend, key, data), None
+            remaining = deadline - time.monotonic()
+            if token is not None or remaining <= 0:
+                return _MISSING, token
+            time.sleep(min(poll, remaining))
+            poll = min(poll * 2, LOCK_POLL_MAX)
+
+    def get_or_compute(self, key, compute, cache_if=None):
+        """Renvoie la valeur en cache ou la calcule avec `compute()`.
+
+        `cache_if(value)` permet de ne pas mettre en cache certains résultats (ex. None) ;
+        les threads qui attendaient ce calcul reçoivent quand même la valeur.
+        """
+        value = self._get_local(key)
+        if value is not _MISSING:
+            record_cache(self.name, True)
+            return value
+        with self._lock:
+            flight = self._inflight.get(key)
+            owner = flight is None
+            if owner:
+                flight = self._inflight[key] = _Flight()
+        if not owner:
+            record_cache(self.name, False)
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            if flight.value is not _MISSING:
+                return flight.value
+            # Calcul interrompu (arrêt du script du propriétaire) : on calcule soi-même
+            return compute()
+        backend, token = self._backend(), None
+        try:
+            if backend is not None:
+                value, token = self._claim_shared(backend, key)
+                if value is not _MISSING:
+                    record_cache(self.name, True, shared=True)
+                    flight.value = value
+                    return value
+            record_cache(self.name, False)
+            value = compute()
+            if cache_if is None or cache_if(value):
+                self.set(key, value)
+            flight.value = value
+            return value
+        except Exception as e:
+            # Une source en panne n'est pas rappelée par chacun des threads en attente
+            flight.error = e
+            raise
+        finally:
+            if token is not None:
+                backend.release(self._shared_key(key), token)
+            with self._lock:
+                del self._inflight[key]
+            flight.done.set()
+
+    def snapshot(self):
+        """Entrées du cache, même expirées : liste de (clé, expiration, enregistrement, valeur).
+
+        Les instants sont en temps epoch pour rester valables après un redémarrage.
+        """
+        offset = time.time() - time.monotonic()
+        with self._lock:
+            return [(key, expires_at + offset, stored_at + offset, value)
+                    for key, (expires_at, stored_at, value) in self._data.items()]
+
+    def restore(self, entries):
+        """Ajoute les entrées de `snapshot()` absentes du cache ; renvoie leur nombre.
+
+        Les entrées déjà présentes, plus récentes, sont gardées ; les restaurées passent
+        en tête de l'ordre LRU (premières évincées).
+        """
+        offset = time.time() - time.monotonic()
+        restored = 0
+        with self._lock:
+            for key, expires_at, stored_at, value in reversed(entries):
+                if key in self._data:
+                    continue
+                self._data[key] = (expires_at - offset, stored_at - offset, value)
+                self._data.move_to_end(key, last=False)
+                restored += 1
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return restored
+
+    def clear(self):
+        """Vide le cache local (le stockage partagé n'est pas modifié)."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+
+FUNDAMENTALS = TTLCache("fundamentals", ttl=6 * 3600, shared=True)
+HISTORIES = TTLCache("histories", ttl=3600, shared=True)
+# Partagé aussi pour le quota : une réplique ne redemande pas ce qu'une autre a déjà payé
+ALPHA_VANTAGE = TTLCache("alpha_vantage", ttl=24 * 3600, shared=True)
+NEWS = TTLCache("news", ttl=3600, shared=True)
+# Cache négatif : symboles inconnus ou radiés chez Yahoo, à ne plus interroger
+DEAD_SYMBOLS = TTLCache("dead_symbols", ttl=24 * 3600)
+SECTORS = TTLCache("sectors", ttl=24 * 3600)
+PEERS = TTLCache("peers", ttl=6 * 3600, maxsize=16)
+SCREENERS = TTLCache("screeners", ttl=6 * 3600, maxsize=16)
+LLM_ANSWERS = TTLCache("llm_answers", ttl=6 * 3600, maxsize=256, shared=True)
+# Analyses IA des classements, par entreprise (clé : hash du nom, des données et du type)
+AI_ANALYSES = TTLCache("ai_analyses", ttl=24 * 3600, shared=True)
+# Clé (ticker, jour) : un score par ticker et par jour
+SENTIMENT = TTLCache("sentiment", ttl=24 * 3600, shared=True)
+SEARCHES = TTLCache("searches", ttl=24 * 3600, shared=True)
+# Comptes annuels (statements.py) : relus du disque, revalidés après une publication de résultats
+STATEMENTS = TTLCache("statements", ttl=6 * 3600, maxsize=512, shared=True)
+# Panneaux de cours alignés (comparison.history_panel), dérivés de HISTORIES
+PANELS = TTLCache("panels", ttl=3600, maxsize=64)
+
+CACHES = [FUNDAMENTALS, HISTORIES, ALPHA_VANTAGE, NEWS, DEAD_SYMBOLS, SECTORS, PEERS, SCREENERS, LLM_ANSWERS,
+          AI_ANALYSES, SENTIMENT, SEARCHES, STATEMENTS, PANELS]
+# Caches enregistrés par `snapshot` : les index dérivés (PEERS, SCREENERS) se reconstruisent
+SNAPSHOT_CACHES = [FUNDAMENTALS, HISTORIES, ALPHA_VANTAGE, NEWS, DEAD_SYMBOLS, SECTORS, LLM_ANSWERS, AI_ANALYSES,
+                   SENTIMENT, SEARCHES]
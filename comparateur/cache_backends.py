@@ -0,0 +1,242 @@
+"""Stockage partagé des caches entre répliques de l'application.
+
+Avec `CACHE_URL=redis://hôte:6379/0`, les caches déclarés `shared=True` (`cache.py`)
+lisent et écrivent aussi dans un serveur compatible Redis : une réplique profite des
+fondamentaux, historiques et réponses d'IA déjà obtenus par les autres, et un verrou
+`SET NX PX` fait qu'une clé absente n'est demandée à la source que par une réplique.
+Lecture de la valeur et prise du verrou se font en un seul aller-retour (`CLAIM_SCRIPT`).
+Sans `CACHE_URL`, tout reste dans la mémoire du processus.
+
+Les valeurs sont signées (HMAC) avec `CACHE_SECRET`, commun à toutes les répliques, et
+vérifiées avant d'être désérialisées : sans `CACHE_SECRET`, `CACHE_URL` est ignorée.
+
+Le client parle directement le protocole RESP (aucune dépendance). Un stockage
+injoignable n'interrompt jamais une page : il est ignoré quelques secondes puis retenté.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from urllib.parse import unquote, urlparse
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "comparateur:"
+# Libère le verrou seulement s'il porte encore notre jeton (il a pu expirer entre-temps)
+RELEASE_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) else return 0 end"
+# Valeur de KEYS[1] si elle existe, sinon 1 si le verrou KEYS[2] est pris (jeton ARGV[1]), 0 s'il est déjà tenu
+CLAIM_SCRIPT = ("local value = redis.call('get', KEYS[1]) if value then return value end "
+                "if redis.call('set', KEYS[2], ARGV[1], 'NX', 'PX', ARGV[2]) then return 1 else return 0 end")
+
+
+class BackendError(Exception):
+    """Erreur renvoyée par le serveur (réponse `-ERR ...`)."""
+
+
+class CacheBackend:
+    """Interface d'un stockage partagé : des octets par clé, avec expiration, et des verrous.
+
+    `secret` (octets) signe les valeurs écrites par `cache.TTLCache` ; toutes les
+    répliques doivent partager le même. Les implémentations ne lèvent pas d'erreur quand
+    le stockage est injoignable : `get` renvoie None et `acquire` considère le verrou
+    comme obtenu, pour que chaque réplique continue seule.
+    """
+
+    secret = None
+
+    def get(self, key):
+        """Octets stockés sous `key`, ou None."""
+        raise NotImplementedError
+
+    def set(self, key, data, ttl):
+        """Stocke `data` sous `key` pendant `ttl` secondes."""
+        raise NotImplementedError
+
+    def acquire(self, key, ttl):
+        """Prend le verrou `key` pour `ttl` secondes ; renvoie un jeton, ou None s'il est déjà pris."""
+        raise NotImplementedError
+
+    def release(self, key, token):
+        """Rend le verrou pris avec `token`."""
+        raise NotImplementedError
+
+    def claim(self, key, ttl):
+        """Valeur stockée sous `key`, sinon le verrou `key` : (octets ou None, jeton ou None).
+
+        (None, None) : la clé est absente et le verrou déjà pris par une autre réplique.
+        """
+        data = self.get(key)
+        if data is not None:
+            return data, None
+        return None, self.acquire(key, ttl)
+
+
+def _encode(*args):
+    parts = [f"*{len(args)}\r\n".encode()]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode()
+        parts += [f"${len(data)}\r\n".encode(), data, b"\r\n"]
+    return b"".join(parts)
+
+
+def _read_reply(stream):
+    line = stream.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("connexion fermée par le serveur")
+    kind, payload = line[:1], line[1:-2]
+    if kind == b"+":
+        return payload.decode()
+    if kind == b"-":
+        raise BackendError(payload.decode())
+    if kind == b":":
+        return int(payload)
+    if kind == b"$":
+        size = int(payload)
+        if size < 0:
+            return None
+        data = stream.read(size + 2)
+        if len(data) != size + 2:
+            raise ConnectionError("réponse tronquée")
+        return data[:-2]
+    if kind == b"*":
+        size = int(payload)
+        return None if size < 0 else [_read_reply(stream) for _ in range(size)]
+    raise ConnectionError(f"réponse inattendue : {line[:40]!r}")
+
+
+class RedisBackend(CacheBackend):
+    """Client RESP minimal (GET, SET, EVAL) avec un pool de connexions par processus."""
+
+    def __init__(self, host="127.0.0.1", port=6379, db=0, password=None, timeout=2.0, retry_after=15.0,
+                 max_idle=8, secret=None):
+        if not secret:
+            raise ValueError("Clé de signature du cache partagé (CACHE_SECRET) manquante")
+        self.secret = secret
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+        self._down_until = 0.0
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        """`redis://[:mot_de_passe@]hôte[:port][/base]`."""
+        parts = urlparse(url)
+        if parts.scheme != "redis":
+            raise ValueError(f"CACHE_URL non prise en charge : {url}")
+        return cls(parts.hostname or "127.0.0.1", parts.port or 6379, int(parts.path.strip("/") or 0),
+                   unquote(parts.password) if parts.password else None, **kwargs)
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        connection = (sock, sock.makefile("rb"))
+        if self.password:
+            self._send(connection, "AUTH", self.password)
+        if self.db:
+            self._send(connection, "SELECT", self.db)
+        return connection
+
+    @staticmethod
+    def _send(connection, *args):
+        sock, stream = connection
+        sock.sendall(_encode(*args))
+        return _read_reply(stream)
+
+    def execute(self, *args):
+        """Envoie une commande et renvoie la réponse décodée ; lève OSError ou `BackendError`."""
+        with self._lock:
+            connection = self._idle.pop() if self._idle else None
+        if connection is None:
+            connection = self._connect()
+        try:
+            reply = self._send(connection, *args)
+        except BackendError:
+            self._recycle(connection)
+            raise
+        except BaseException:
+            connection[0].close()
+            raise
+        self._recycle(connection)
+        return reply
+
+    def _recycle(self, connection):
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(connection)
+                return
+        connection[0].close()
+
+    def _call(self, *args, default=None):
+        """`execute`, sauf quand le stockage est injoignable : renvoie alors `default`."""
+        if time.monotonic() < self._down_until:
+            return default
+        try:
+            return self.execute(*args)
+        except (OSError, BackendError) as e:
+            logger.warning("Cache partagé %s:%s indisponible (%s) ; nouvel essai dans %.0f s",
+                           self.host, self.port, e, self.retry_after)
+            self._down_until = time.monotonic() + self.retry_after
+            return default
+
+    def get(self, key):
+        return self._call("GET", KEY_PREFIX + key)
+
+    def set(self, key, data, ttl):
+        self._call("SET", KEY_PREFIX + key, data, "PX", max(1, int(ttl * 1000)))
+
+    def acquire(self, key, ttl):
+        token = uuid.uuid4().hex
+        reply = self._call("SET", KEY_PREFIX + "lock:" + key, token, "NX", "PX", max(1, int(ttl * 1000)),
+                           default="OK")
+        return token if reply == "OK" else None
+
+    def release(self, key, token):
+        self._call("EVAL", RELEASE_SCRIPT, 1, KEY_PREFIX + "lock:" + key, token)
+
+    def claim(self, key, ttl):
+        token = uuid.uuid4().hex
+        reply = self._call("EVAL", CLAIM_SCRIPT, 2, KEY_PREFIX + key, KEY_PREFIX + "lock:" + key, token,
+                           max(1, int(ttl * 1000)), default=1)
+        if isinstance(reply, bytes):
+            return reply, None
+        return None, token if reply == 1 else None
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for sock, _ in idle:
+            sock.close()
+
+
+_backend = None
+_configured = False
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Stockage partagé défini par `CACHE_URL` et `CACHE_SECRET` (créé au premier appel), ou None."""
+    global _backend, _configured
+    if not _configured:
+        with _backend_lock:
+            if not _configured:
+                url, secret = os.getenv("CACHE_URL"), os.getenv("CACHE_SECRET")
+                if url and not secret:
+                    logger.warning("CACHE_URL ignorée : CACHE_SECRET est nécessaire pour signer les valeurs partagées")
+                _backend = RedisBackend.from_url(url, secret=secret.encode()) if url and secret else None
+                _configured = True
+    return _backend
+
+
+def set_backend(backend):
+    """Remplace le stockage partagé (None : caches locaux uniquement)."""
+    global _backend, _configured
+    with _backend_lock:
+        _backend, _configured = backend, True
@@ -0,0 +1,110 @@
+"""Préparation des données envoyées aux graphiques Plotly.
+
+Une série quotidienne sur 10 ans ou plus dépasse largement la largeur d'un graphique
+en pixels : on la réduit côté serveur (algorithme LTTB, qui conserve la forme de la
+courbe et ses extrêmes), on calcule les histogrammes en NumPy pour n'envoyer que les
+barres, et on passe en rendu WebGL (`Scattergl`) quand une trace reste volumineuse.
+"""
+
+# Environ la largeur d'un graphique en pixels : au-delà, les points ne se distinguent plus
+MAX_POINTS = 1500
+# Nombre de points à partir duquel une courbe est dessinée en WebGL plutôt qu'en SVG
+WEBGL_THRESHOLD = 1000
+HISTOGRAM_BINS = 60
+
+
+def lttb(x, y, threshold):
+    """Indices des points retenus par Largest-Triangle-Three-Buckets (`threshold` points au plus).
+
+    `x` et `y` sont des tableaux numériques de même longueur, `x` croissant.
+    """
+    import numpy as np
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    # Premier et dernier points conservés ; les autres répartis en threshold - 2 paquets
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, stop = edges[i], edges[i + 1]
+        # Sommet suivant : moyenne du paquet d'après (ou dernier point)
+        next_start, next_stop = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        next_x = x[next_start:next_stop].mean()
+        next_y = y[next_start:next_stop].mean()
+        # Aire du triangle (point précédent retenu, candidat, moyenne suivante)
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:stop] - y[previous])
+            - (x[previous] - x[start:stop]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[i + 1] = previous
+    return selected
+
+
+def _positions(index):
+    """Abscisses numériques d'un index pandas (dates en nanosecondes)."""
+    import numpy as np
+    import pandas as pd
+
+    if isinstance(index, pd.DatetimeIndex):
+        return index.asi8.astype(float)
+    if pd.api.types.is_numeric_dtype(index):
+        return index.to_numpy(dtype=float)
+    return np.arange(len(index), dtype=float)
+
+
+def downsample(series, max_points=MAX_POINTS):
+    """Série réduite à `max_points` points au plus (valeurs manquantes retirées)."""
+    series = series.dropna()
+    if max_points is None or len(series) <= max_points:
+        return series
+    return series.iloc[lttb(_positions(series.index), series.to_numpy(dtype=float), max_points)]
+
+
+def downsample_frame(frame, max_points=MAX_POINTS):
+    """Tableau réduit aux dates retenues par LTTB pour au moins une de ses colonnes."""
+    import numpy as np
+
+    if max_points is None or len(frame) <= max_points or frame.empty:
+        return frame
+    per_column = max(3, max_points // len(frame.columns))
+    x = _positions(frame.index)
+    keep = np.zeros(len(frame), dtype=bool)
+    for column in frame.columns:
+        values = frame[column].to_numpy(dtype=float)
+        present = np.flatnonzero(~np.isnan(values))
+        keep[present[lttb(x[present], values[present], per_column)]] = True
+    return frame.iloc[np.flatnonzero(keep)]
+
+
+def line_trace(series, name, max_points=MAX_POINTS, **kwargs):
+    """Trace de courbe pour `series` : réduite, et en WebGL si elle reste volumineuse."""
+    import plotly.graph_objects as go
+
+    series = downsample(series, max_points)
+    trace = go.Scattergl if len(series) > WEBGL_THRESHOLD else go.Scatter
+    kwargs.setdefault("mode", "lines")
+    return trace(x=series.index, y=series.to_numpy(), name=name, **kwargs)
+
+
+def histogram_bins(samples, bins=HISTOGRAM_BINS):
+    """Bornes communes et effectifs de chaque échantillon : (bornes, [effectifs, ...])."""
+    import numpy as np
+
+    arrays = [np.asarray(sample, dtype=float) for sample in samples]
+    arrays = [values[np.isfinite(values)] for values in arrays]
+    pooled = np.concatenate(arrays) if arrays else np.empty(0)
+    edges = np.histogram_bin_edges(pooled, bins=bins)
+    return edges, [np.histogram(values, bins=edges)[0] for values in arrays]
+
+
+def histogram_trace(edges, counts, name, **kwargs):
+    """Barres d'un histogramme précalculé (une barre par intervalle)."""
+    import plotly.graph_objects as go
+
+    return go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=edges[1:] - edges[:-1], name=name, **kwargs)
@@ -0,0 +1,222 @@
+"""Comparaison de 2 à 20 entreprises à partir d'un tableau unique au format long."""
+import functools
+
+MIN_COMPANIES = 2
+MAX_COMPANIES = 20
+
+# (champ Yahoo, libellé) des indicateurs clés affichés en barres groupées
+KEY_METRICS = [
+    ("currentPrice", "Prix actuel"),
+    ("marketCap", "Capitalisation"),
+    ("totalRevenue", "Chiffre d'affaires"),
+    ("netIncomeToCommon", "Bénéfice net"),
+    ("returnOnEquity", "ROE"),
+]
+
+RADAR_AXES = ["Rentabilité", "Croissance", "Solidité", "Valorisation", "Dividende"]
+
+_RADAR_FIELDS = ["returnOnEquity", "revenueGrowth", "debtToEquity", "trailingPE", "dividendYield"]
+
+
+def parse_tickers(*groups):
+    """Fusionne des tickers saisis (listes ou textes séparés par des virgules) sans doublon."""
+    tickers = []
+    for group in groups:
+        if isinstance(group, str):
+            group = group.replace(";", ",").split(",")
+        for ticker in group:
+            ticker = (ticker or "").strip().upper()
+            if ticker:
+                tickers.append(ticker)
+    return list(dict.fromkeys(tickers))[:MAX_COMPANIES]
+
+
+def company_labels(infos):
+    """Libellé d'affichage par ticker (nom court, suffixé du ticker en cas de doublon)."""
+    labels = {}
+    for ticker, info in infos.items():
+        label = info.get("shortName", ticker) or ticker
+        if label in labels.values():
+            label = f"{label} ({ticker})"
+        labels[ticker] = label
+    return labels
+
+
+def fundamentals_frame(infos):
+    """Une ligne par ticker, champs numériques utiles aux graphiques (NaN si absent)."""
+    import pandas as pd
+
+    fields = list(dict.fromkeys([field for field, _ in KEY_METRICS] + _RADAR_FIELDS))
+    df = pd.DataFrame.from_dict(
+        {ticker: {field: info.get(field) for field in fields} for ticker, info in infos.items()},
+        orient="index",
+    )
+    df = df.apply(pd.to_numeric, errors="coerce")
+    df.index.name = "Symbole"
+    return df
+
+
+def radar_frame(fundamentals):
+    """Valeurs des axes du radar, calculées en une passe sur toutes les entreprises."""
+    import pandas as pd
+
+    f = fundamentals.fillna(0)
+    pe = f["trailingPE"].where(f["trailingPE"] != 0, 1)
+    return pd.DataFrame({
+        "Rentabilité": f["returnOnEquity"] * 10,
+        "Croissance": f["revenueGrowth"] * 100,
+        "Solidité": 100 - f["debtToEquity"],
+        "Valorisation": 100 / pe,
+        "Dividende": f["dividendYield"] * 100,
+    }, index=fundamentals.index)
+
+
+def comparison_frame(infos):
+    """Tableau long (Symbole, Entreprise, Graphique, Indicateur, Valeur) pour barres et radars."""
+    import pandas as pd
+
+    fundamentals = fundamentals_frame(infos)
+    labels = company_labels(infos)
+    bars = fundamentals[[field for field, _ in KEY_METRICS]].fillna(0)
+    bars = bars.rename(columns=dict(KEY_METRICS))
+    parts = []
+    for chart, wide in (("barres", bars), ("radar", radar_frame(fundamentals))):
+        long = wide.reset_index().melt(id_vars="Symbole", var_name="Indicateur", value_name="Valeur")
+        long["Graphique"] = chart
+        parts.append(long)
+    df = pd.concat(parts, ignore_index=True)
+    df["Entreprise"] = df["Symbole"].map(labels)
+    return df[["Symbole", "Entreprise", "Graphique", "Indicateur", "Valeur"]]
+
+
+def _aligned_closes(histories, labels=None):
+    """Clôtures sur l'union des jours de cotation, NaN les jours où un titre ne cote pas."""
+    import pandas as pd
+
+    labels = labels or {}
+    closes = {
+        labels.get(ticker, ticker): _on_calendar_days(hist["Close"])
+        for ticker, hist in histories.items()
+        if hist is not None and not hist.empty
+    }
+    if not closes:
+        return pd.DataFrame()
+    return pd.concat(closes, axis=1).sort_index()
+
+
+class PricePanel:
+    """Cours de clôture de plusieurs titres, alignés une seule fois sur un calendrier commun.
+
+    `closes` est complété vers l'avant ; les rendements ne comptent que les jours où le
+    titre a coté (un jour férié d'une place ne crée pas de rendement nul), et la
+    corrélation porte sur les jours où les deux titres ont coté. Les volatilités et
+    performances sont en pourcentage.
+    """
+
+    TRADING_DAYS = 252
+
+    def __init__(self, raw_closes):
+        self.closes = raw_closes.ffill()
+        self.traded = raw_closes.notna()
+
+    @classmethod
+    def from_histories(cls, histories, labels=None):
+        return cls(_aligned_closes(histories, labels))
+
+    @property
+    def empty(self):
+        return self.closes.empty
+
+    @property
+    def columns(self):
+        return list(self.closes.columns)
+
+    @functools.cached_property
+    def returns(self):
+        """Rendements journaliers (NaN les jours sans cotation)."""
+        return self.closes.pct_change(fill_method=None).where(self.traded)
+
+    def cumulative_returns(self):
+        """Rendement cumulé (%) depuis le premier cours de chaque titre."""
+        return (self.closes / self.closes.bfill().iloc[0] - 1) * 100
+
+    def performance(self):
+        """Performance (%) entre le premier et le dernier cours de chaque titre."""
+        return (self.closes.iloc[-1] / self.closes.bfill().iloc[0] - 1) * 100
+
+    def volatility(self):
+        """Volatilité annualisée (%) des rendements journaliers."""
+        return self.returns.std() * self.TRADING_DAYS ** 0.5 * 100
+
+    def rolling_volatility(self, window=30):
+        """Volatilité annualisée (%) sur une fenêtre glissante de `window` jours de cotation."""
+        rolling = self.returns.apply(lambda column: column.dropna().rolling(window).std())
+        return rolling.reindex(self.closes.index) * self.TRADING_DAYS ** 0.5 * 100
+
+    def correlation(self):
+        """Matrice de corrélation des rendements journaliers."""
+        return self.returns.corr()
+
+
+def history_panel(symbols, period="1y"):
+    """`PricePanel` des historiques de `{libellé: symbole}` sur `period` (mis en cache).
+
+    Les historiques viennent du cache des téléchargements groupés (`fetch_histories`) ;
+    le panneau aligné est gardé tant que ces historiques sont valides.
+    """
+    from .cache import PANELS
+    from .providers import fetch_histories
+
+    def compute():
+        histories = fetch_histories(list(dict.fromkeys(symbols.values())), period=period)
+        return PricePanel.from_histories({label: histories[symbol] for label, symbol in symbols.items()})
+
+    return PANELS.get_or_compute((tuple(symbols.items()), period), compute, cache_if=lambda panel: not panel.empty)
+
+
+def _on_calendar_days(series):
+    """Indexe une série par jour calendaire sans fuseau, pour aligner des places différentes."""
+    index = series.index
+    if getattr(index, "tz", None) is not None:
+        index = index.tz_localize(None)
+    series = series.set_axis(index.normalize())
+    return series[~series.index.duplicated(keep="last")]
+
+
+def _scores(infos):
+    from .scoring import score_financier
+
+    scores = {}
+    for ticker, info in infos.items():
+        warnings = []
+        scores[ticker] = (score_financier(info, warn=warnings.append), warnings)
+    return scores
+
+
+def comparison_graph(tickers, with_ai=True):
+    """Graphe des données de la page de comparaison, prêt à lancer avec `run()`.
+
+    Fondamentaux, données Alpha Vantage et historiques partent en parallèle ; notes,
+    tableau des graphiques et prompt suivent dès que les fondamentaux sont là, puis
+    l'analyse IA (sur le pool réservé à l'IA) dès que le prompt est prêt. `infos` et
+    `alpha_vantage` renvoient (résultats, erreurs) comme `fetch_all` ; `scores` associe
+    à chaque ticker (note, avertissements).
+    """
+    from .analysis import comparison_prompt
+    from .budget import submit_llm
+    from .llm import cached_chat
+    from .providers import fetch_all, fetch_histories, fetch_info, get_alpha_vantage_overview
+    from .taskgraph import TaskGraph
+
+    tickers = list(tickers)
+    graph = TaskGraph()
+    graph.add("infos", fetch_all, args=(fetch_info, tickers))
+    graph.add("alpha_vantage", fetch_all, args=(get_alpha_vantage_overview, tickers))
+    graph.add("histories", fetch_histories, args=(tickers,), kwargs={"period": "1y"})
+    graph.add("scores", lambda infos: _scores(infos[0]), deps=["infos"])
+    graph.add("frame", lambda infos: comparison_frame(infos[0]), deps=["infos"])
+    graph.add("prompt", lambda infos: comparison_prompt(infos[0]), deps=["infos"])
+    if with_ai:
+        graph.add("ai", cached_chat, deps=["prompt"], submit=submit_llm,
+                  kwargs={"temperature": 0.7, "max_tokens": 1500, "feature": "comparison"})
+    return graph
@@ -0,0 +1,40 @@
+"""Contrôle de cohérence des données entre Yahoo Finance et Alpha Vantage."""
+
+# (champ Yahoo, champ Alpha Vantage, libellé utilisé dans les alertes)
+DIVERGENCE_FIELDS = [
+    ("marketCap", "MarketCapitalization", "la capitalisation boursière"),
+    ("totalRevenue", "RevenueTTM", "le chiffre d'affaires"),
+    ("netIncomeToCommon", "NetIncomeTTM", "le bénéfice net"),
+]
+
+
+def compare_field(yf_info, av_info, field_yf, field_av, tolerance=0.15):
+    """Compare un champ entre Yahoo Finance et Alpha Vantage, True si cohérent ou non comparable."""
+    try:
+        v1 = float(yf_info.get(field_yf, 0))
+        v2 = float(av_info.get(field_av, 0))
+        if v1 == 0 or v2 == 0:
+            return True  # Non comparable
+        return abs(v1 - v2) / max(abs(v1), abs(v2)) < tolerance
+    except Exception:
+        return True
+
+
+def divergent_fields(info, av_info):
+    """Liste les champs (yahoo, alpha vantage, libellé) qui divergent entre les deux sources."""
+    if not av_info:
+        return []
+    return [
+        (field_yf, field_av, label)
+        for field_yf, field_av, label in DIVERGENCE_FIELDS
+        if not compare_field(info, av_info, field_yf, field_av)
+    ]
+
+
+def divergence_alerts(info, av_info, label):
+    """Messages d'alerte pour chaque champ divergent entre Yahoo et Alpha Vantage."""
+    return [
+        f"⚠️ Divergence sur {field_label} de {label} entre Yahoo et Alpha Vantage : "
+        f"{info.get(field_yf, 'N/A')} vs {av_info.get(field_av, 'N/A')}"
+        for field_yf, field_av, field_label in divergent_fields(info, av_info)
+    ]
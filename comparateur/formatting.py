@@ -0,0 +1,19 @@
+"""Fonctions de mise en forme des valeurs financières."""
+
+
+def format_currency(value):
+    """Formate les valeurs numériques en format monétaire lisible."""
+    if value is None:
+        return "N/A"
+    try:
+        v = float(value)
+        if abs(v) > 1e9:
+            return f"{v/1e9:.2f} Md"
+        elif abs(v) > 1e6:
+            return f"{v/1e6:.2f} M"
+        elif abs(v) > 1e3:
+            return f"{v:.2f} K"
+        else:
+            return f"{v:.2f}"
+    except ValueError:
+        return "N/A"
@@ -0,0 +1,69 @@
+"""Choix du moteur d'IA (Groq ou modèle local) pour chaque fonctionnalité.
+
+`LLM_BACKEND` fixe le moteur par défaut (`groq` ou `local`) ; `LLM_BACKEND_<FONCTION>`
+le remplace pour une fonctionnalité, par exemple `LLM_BACKEND_RANKING=local` pour
+les analyses de classement. Fonctionnalités : ranking, comparison, case, market,
+markets, market_advice, concept, question, scenario.
+"""
+import hashlib
+import os
+
+from . import metrics
+from .budget import submit_llm
+from .cache import LLM_ANSWERS
+from .providers import get_groq_api_key, groq_chat
+
+BACKENDS = ("groq", "local")
+
+
+def llm_backend(feature=None):
+    """Moteur configuré pour une fonctionnalité."""
+    backend = os.getenv("LLM_BACKEND", "groq").lower()
+    if feature:
+        backend = os.getenv(f"LLM_BACKEND_{feature.upper()}", backend).lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Moteur d'IA inconnu : {backend} (attendu : {', '.join(BACKENDS)})")
+    return backend
+
+
+def llm_available(feature=None):
+    """Vrai si le moteur de la fonctionnalité peut répondre (clé Groq présente ou modèle local)."""
+    return llm_backend(feature) == "local" or bool(get_groq_api_key())
+
+
+def chat(prompt, temperature=0.7, max_tokens=500, feature=None, json_mode=False):
+    """Réponse du moteur de la fonctionnalité à un prompt.
+
+    Lève `GroqError` si Groq répond avec un statut autre que 200.
+    """
+    if llm_backend(feature) == "local":
+        from .local_llm import get_local_llm
+
+        generate = metrics.timed("local_llm", "generate", get_local_llm().generate)
+        return generate([prompt], temperature=temperature, max_tokens=max_tokens)[0]
+    return groq_chat(prompt, temperature=temperature, max_tokens=max_tokens, json_mode=json_mode)
+
+
+def chat_batch(prompts, temperature=0.7, max_tokens=500, feature=None):
+    """Réponses à plusieurs prompts ; un seul lot de génération avec le modèle local."""
+    if llm_backend(feature) == "local":
+        from .local_llm import get_local_llm
+
+        generate = metrics.timed("local_llm", "generate", get_local_llm().generate)
+        return generate(list(prompts), temperature=temperature, max_tokens=max_tokens)
+    return [groq_chat(prompt, temperature=temperature, max_tokens=max_tokens) for prompt in prompts]
+
+
+def cached_chat(prompt, temperature=0.7, max_tokens=500, feature=None):
+    """`chat` mis en cache par prompt ; deux demandes identiques simultanées ne font qu'un appel."""
+    key = hashlib.md5(f"{llm_backend(feature)}|{temperature}|{max_tokens}|{prompt}".encode()).hexdigest()
+    return LLM_ANSWERS.get_or_compute(
+        key, lambda: chat(prompt, temperature=temperature, max_tokens=max_tokens, feature=feature))
+
+
+def chat_async(prompt, temperature=0.7, max_tokens=500, feature=None):
+    """Lance `cached_chat` en arrière-plan et renvoie un `Future`.
+
+    Si la page n'a pas pu attendre la réponse, elle est déjà prête au prochain affichage.
+    """
+    return submit_llm(cached_chat, prompt, temperature=temperature, max_tokens=max_tokens, feature=feature)
@@ -0,0 +1,78 @@
+"""Inférence locale sur CPU avec `transformers`, en alternative à Groq.
+
+Le modèle est chargé une seule fois par processus (au premier appel) puis partagé
+entre les sessions. Variables d'environnement :
+
+- `LOCAL_LLM_MODEL` : modèle Hugging Face instruct (défaut : Qwen2.5 0.5B Instruct) ;
+- `LOCAL_LLM_QUANTIZE=1` : quantification dynamique int8 des couches linéaires ;
+- `LOCAL_LLM_THREADS` : nombre de threads torch.
+"""
+import os
+import threading
+
+DEFAULT_LOCAL_MODEL = "Qwen/Qwen2.5-0.5B-Instruct"
+
+_instance = None
+_instance_lock = threading.Lock()
+
+
+class LocalLLM:
+    """Modèle génératif local avec génération par lots."""
+
+    def __init__(self, model_name=DEFAULT_LOCAL_MODEL, quantize=False, threads=None):
+        import torch
+        from transformers import AutoModelForCausalLM, AutoTokenizer
+
+        if threads:
+            torch.set_num_threads(threads)
+        self.model_name = model_name
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        # Remplissage à gauche : les suites générées commencent toutes au même indice
+        self.tokenizer.padding_side = "left"
+        if self.tokenizer.pad_token is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+        model = AutoModelForCausalLM.from_pretrained(model_name, torch_dtype=torch.float32)
+        model.eval()
+        if quantize:
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.model = model
+        # generate() n'est pas réentrant sur un même modèle : on sérialise les lots
+        self._lock = threading.Lock()
+
+    def _format(self, prompt):
+        messages = [{"role": "user", "content": prompt}]
+        if getattr(self.tokenizer, "chat_template", None):
+            return self.tokenizer.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
+        return prompt
+
+    def generate(self, prompts, temperature=0.7, max_tokens=500):
+        """Génère une réponse par prompt, en un seul passage par lot."""
+        import torch
+
+        texts = [self._format(prompt) for prompt in prompts]
+        inputs = self.tokenizer(texts, return_tensors="pt", padding=True)
+        sampling = {"do_sample": True, "temperature": temperature} if temperature > 0 else {"do_sample": False}
+        with self._lock, torch.inference_mode():
+            output = self.model.generate(
+                **inputs,
+                max_new_tokens=max_tokens,
+                pad_token_id=self.tokenizer.pad_token_id,
+                **sampling,
+            )
+        new_tokens = output[:, inputs["input_ids"].shape[1]:]
+        return [text.strip() for text in self.tokenizer.batch_decode(new_tokens, skip_special_tokens=True)]
+
+
+def get_local_llm():
+    """Instance partagée du modèle local, créée au premier appel."""
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                threads = os.getenv("LOCAL_LLM_THREADS")
+                _instance = LocalLLM(
+                    model_name=os.getenv("LOCAL_LLM_MODEL", DEFAULT_LOCAL_MODEL),
+                    quantize=os.getenv("LOCAL_LLM_QUANTIZE", "0") == "1",
+                    threads=int(threads) if threads else None,
+                )
+    return _instance
@@ -0,0 +1,38 @@
+"""Performances des indices boursiers et indicateurs techniques."""
+from .providers import fetch_history
+
+
+def get_market_data(tickers):
+    import pandas as pd
+
+    data = []
+    for name, symbol in tickers.items():
+        try:
+            hist = fetch_history(symbol, period="6mo")
+            last_close = hist["Close"].iloc[-1] if not hist.empty else None
+            perf_1m = ((hist["Close"].iloc[-1] / hist["Close"].iloc[-22]) - 1) * 100 if len(hist) > 22 else None
+            perf_6m = ((hist["Close"].iloc[-1] / hist["Close"].iloc[0]) - 1) * 100 if len(hist) > 1 else None
+            data.append({
+                "Marché": name,
+                "Symbole": symbol,
+                "Dernière clôture": f"{last_close:.2f}" if last_close else "N/A",
+                "Perf. 1 mois (%)": f"{perf_1m:.2f}" if perf_1m else "N/A",
+                "Perf. 6 mois (%)": f"{perf_6m:.2f}" if perf_6m else "N/A"
+            })
+        except Exception:
+            data.append({
+                "Marché": name,
+                "Symbole": symbol,
+                "Dernière clôture": "N/A",
+                "Perf. 1 mois (%)": "N/A",
+                "Perf. 6 mois (%)": "N/A"
+            })
+    return pd.DataFrame(data)
+
+
+def calculate_rsi(data, window=14):
+    delta = data.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
+    rs = gain / loss
+    return 100 - (100 / (1 + rs))
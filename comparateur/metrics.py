@@ -0,0 +1,230 @@
+"""Métriques d'exécution au format Prometheus : sources externes, caches et pages.
+
+- `comparateur_upstream_seconds` : latence de chaque appel réseau, par source et opération ;
+- `comparateur_upstream_errors_total` : appels en échec, par type d'erreur ;
+- `comparateur_cache_lookups_total` : lectures de cache (`hit` / `miss`), d'où le taux de succès ;
+- `comparateur_render_seconds` : durée d'affichage de chaque page de l'application, par
+  issue (`ok`, `stopped` pour `st.stop()`, `rerun`, `error`) ;
+- `comparateur_cache_entries` et `comparateur_breaker_open` : état relevé à chaque collecte.
+
+Chaque mesure porte l'étiquette `tab` de la page en cours d'affichage (vide hors de
+l'application). Avec `METRICS_PORT`, l'application sert ces métriques sur
+`http://127.0.0.1:<port>/metrics` (`METRICS_HOST` pour une autre interface).
+"""
+import contextvars
+import functools
+import os
+import threading
+import time
+
+# Bornes des histogrammes de latence (secondes)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_TAB = contextvars.ContextVar("comparateur_tab", default="")
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class Counter:
+    """Compteur thread-safe, une valeur par combinaison d'étiquettes."""
+
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values):
+        with self._lock:
+            return self._values.get(label_values, 0)
+
+    def lines(self):
+        with self._lock:
+            values = dict(self._values)
+        return [f"{self.name}{_labels(self.labels, key)} {value}" for key, value in sorted(values.items())]
+
+
+class Histogram:
+    """Histogramme cumulatif thread-safe (bornes `le`, somme et nombre d'observations)."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._values.get(label_values)
+            if series is None:
+                # [effectifs par borne, somme, nombre d'observations]
+                series = self._values[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *label_values):
+        with self._lock:
+            series = self._values.get(label_values)
+            return series[2] if series else 0
+
+    def lines(self):
+        with self._lock:
+            values = {key: (list(counts), total, count) for key, (counts, total, count) in self._values.items()}
+        lines = []
+        for key, (counts, total, count) in sorted(values.items()):
+            for bound, cumulative in zip(self.buckets, counts):
+                lines.append(f"{self.name}_bucket{_labels(self.labels, key, [('le', bound)])} {cumulative}")
+            lines.append(f"{self.name}_bucket{_labels(self.labels, key, [('le', '+Inf')])} {count}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {count}")
+        return lines
+
+
+UPSTREAM_SECONDS = Histogram("comparateur_upstream_seconds", "Latence des appels aux sources externes.",
+                             ("provider", "operation", "tab"))
+UPSTREAM_ERRORS = Counter("comparateur_upstream_errors_total", "Appels aux sources externes en échec.",
+                          ("provider", "operation", "tab", "error"))
+CACHE_LOOKUPS = Counter("comparateur_cache_lookups_total", "Lectures des caches mémoire.",
+                        ("cache", "result", "tab"))
+RENDER_SECONDS = Histogram("comparateur_render_seconds", "Durée d'affichage des pages de l'application.",
+                           ("tab", "outcome"))
+# Exceptions de contrôle de Streamlit (nommées pour ne pas importer Streamlit ici)
+_RENDER_OUTCOMES = {"StopException": "stopped", "RerunException": "rerun"}
+
+METRICS = [UPSTREAM_SECONDS, UPSTREAM_ERRORS, CACHE_LOOKUPS, RENDER_SECONDS]
+
+
+def current_tab():
+    return _TAB.get()
+
+
+def timed(provider, operation, fn):
+    """`fn` enveloppée : chaque appel mesure sa latence et compte ses erreurs."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        tab = _TAB.get()
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            UPSTREAM_ERRORS.inc(provider, operation, tab, type(e).__name__)
+            raise
+        finally:
+            UPSTREAM_SECONDS.observe(time.perf_counter() - started, provider, operation, tab)
+
+    return wrapper
+
+
+def record_cache(cache, hit, shared=False):
+    """Compte une lecture de cache ; `shared` : trouvée dans le stockage partagé entre répliques."""
+    CACHE_LOOKUPS.inc(cache, ("shared_hit" if shared else "hit") if hit else "miss", _TAB.get())
+
+
+def begin_render(tab):
+    """Démarre la mesure de la page `tab` ; les appels qui suivent sont étiquetés `tab`."""
+    return _TAB.set(tab), time.perf_counter()
+
+
+def render_outcome(error=None):
+    """Issue d'un affichage interrompu par `error` (None : affichage complet)."""
+    if error is None:
+        return "ok"
+    return _RENDER_OUTCOMES.get(type(error).__name__, "error")
+
+
+def end_render(started, error=None):
+    """Termine la mesure commencée par `begin_render` ; `error` : exception qui a interrompu la page."""
+    token, started_at = started
+    RENDER_SECONDS.observe(time.perf_counter() - started_at, _TAB.get(), render_outcome(error))
+    _TAB.reset(token)
+
+
+def _state_lines():
+    from .breaker import BREAKERS, CLOSED
+    from .cache import CACHES
+
+    lines = [
+        "# HELP comparateur_cache_entries Entrées présentes dans chaque cache.",
+        "# TYPE comparateur_cache_entries gauge",
+    ]
+    lines += [f"comparateur_cache_entries{_labels(('cache',), (cache.name,))} {len(cache)}" for cache in CACHES]
+    lines += [
+        "# HELP comparateur_breaker_open 1 si le disjoncteur de la source est ouvert ou semi-ouvert.",
+        "# TYPE comparateur_breaker_open gauge",
+    ]
+    lines += [f"comparateur_breaker_open{_labels(('provider',), (breaker.name,))} {int(breaker.state != CLOSED)}"
+              for breaker in BREAKERS]
+    return lines
+
+
+def render_text():
+    """Toutes les métriques au format texte d'exposition Prometheus."""
+    lines = []
+    for metric in METRICS:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.lines())
+    lines.extend(_state_lines())
+    return "\n".join(lines) + "\n"
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_server(port=None, host=None):
+    """Sert `/metrics` dans un thread (une fois par processus) ; sans `METRICS_PORT`, ne fait rien."""
+    global _server
+    port = port or os.getenv("METRICS_PORT")
+    if not port:
+        return None
+    with _server_lock:
+        if _server is not None:
+            return _server
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = render_text().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            _server = ThreadingHTTPServer((host or os.getenv("METRICS_HOST", "127.0.0.1"), int(port)), Handler)
+        except OSError:
+            # Port déjà pris (autre processus de l'application) : pas de second serveur
+            return None
+        threading.Thread(target=_server.serve_forever, name="comparateur-metrics", daemon=True).start()
+        return _server
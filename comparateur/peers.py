@@ -0,0 +1,175 @@
+"""Recherche des concurrents les plus proches d'une entreprise dans l'univers suivi.
+
+Chaque entreprise est décrite par un vecteur normalisé : secteur et industrie (encodage
+one-hot), capitalisation (log), marges et croissance (centrées-réduites). Une requête
+calcule les distances à toute la matrice d'un coup, sans boucle Python.
+
+L'index de tout l'univers se construit en arrière-plan ; en attendant, les pages
+interrogent un index provisoire bâti sur les fondamentaux déjà en cache.
+"""
+import logging
+import math
+import threading
+
+from .cache import FUNDAMENTALS, PEERS
+from .providers import fetch_infos, is_complete
+from .universe import normalize_symbol
+
+logger = logging.getLogger(__name__)
+
+NUMERIC_FEATURES = [
+    "marketCap",
+    "grossMargins",
+    "operatingMargins",
+    "profitMargins",
+    "revenueGrowth",
+    "earningsGrowth",
+]
+
+# Poids des blocs : deux entreprises de la même industrie doivent rester voisines
+SECTOR_WEIGHT = 2.0
+INDUSTRY_WEIGHT = 3.0
+
+
+def _numeric(info, field):
+    value = info.get(field)
+    if not isinstance(value, (int, float)) or isinstance(value, bool) or math.isnan(value):
+        return math.nan
+    if field == "marketCap":
+        return math.log10(value) if value > 0 else math.nan
+    return value
+
+
+class CompetitorIndex:
+    """Matrice de vecteurs caractéristiques des entreprises, interrogeable par k plus proches voisins."""
+
+    def __init__(self, infos, provisional=False):
+        import numpy as np
+
+        self.tickers = list(infos)
+        self.infos = infos
+        # Index provisoire : seulement les entreprises déjà en cache, l'index complet est en construction
+        self.provisional = provisional
+        self.complete = not provisional
+        self.sectors = sorted({info.get("sector") for info in infos.values() if info.get("sector")})
+        self.industries = sorted({info.get("industry") for info in infos.values() if info.get("industry")})
+        raw = np.array([[_numeric(info, field) for field in NUMERIC_FEATURES] for info in infos.values()],
+                       dtype=float).reshape(len(infos), len(NUMERIC_FEATURES))
+        present = ~np.isnan(raw)
+        count = np.maximum(present.sum(axis=0), 1)
+        self.mean = np.nansum(raw, axis=0) / count
+        std = np.sqrt(np.nansum((raw - self.mean) ** 2, axis=0) / count)
+        self.std = np.where(std > 0, std, 1.0)
+        width = len(NUMERIC_FEATURES) + len(self.sectors) + len(self.industries)
+        self.matrix = np.vstack([self.vector(info) for info in infos.values()]) if infos else np.empty((0, width))
+        self._row = {ticker: i for i, ticker in enumerate(self.tickers)}
+
+    def vector(self, info):
+        """Vecteur normalisé d'une entreprise (valeurs manquantes ramenées à la moyenne)."""
+        import numpy as np
+
+        numeric = (np.array([_numeric(info, field) for field in NUMERIC_FEATURES]) - self.mean) / self.std
+        sector = np.array([SECTOR_WEIGHT * (info.get("sector") == s) for s in self.sectors], dtype=float)
+        industry = np.array([INDUSTRY_WEIGHT * (info.get("industry") == i) for i in self.industries], dtype=float)
+        return np.concatenate([np.nan_to_num(numeric), sector, industry])
+
+    def nearest(self, ticker, info=None, k=5):
+        """Les `k` entreprises les plus proches de `ticker` : liste de (ticker, distance)."""
+        import numpy as np
+
+        if ticker in self._row:
+            target = self.matrix[self._row[ticker]]
+        else:
+            target = self.vector(info if info is not None else {})
+        distances = np.sqrt(((self.matrix - target) ** 2).sum(axis=1))
+        if ticker in self._row:
+            distances[self._row[ticker]] = np.inf
+        k = min(k, int(np.isfinite(distances).sum()))
+        if k <= 0:
+            return []
+        closest = np.argpartition(distances, k - 1)[:k]
+        closest = closest[np.argsort(distances[closest])]
+        return [(self.tickers[i], float(distances[i])) for i in closest]
+
+    def competitors(self, ticker, info=None, k=5):
+        """Concurrents et parts relatives de capitalisation (%), entreprise incluse."""
+        import pandas as pd
+
+        info = info if info is not None else self.infos.get(ticker, {})
+        rows = [(ticker, info, 0.0)] + [(peer, self.infos[peer], distance)
+                                        for peer, distance in self.nearest(ticker, info, k)]
+        df = pd.DataFrame({
+            "Symbole": [symbol for symbol, _, _ in rows],
+            "Entreprise": [peer_info.get("shortName", symbol) or symbol for symbol, peer_info, _ in rows],
+            "Capitalisation Boursière": [peer_info.get("marketCap") or 0 for _, peer_info, _ in rows],
+            "Distance": [distance for _, _, distance in rows],
+        })
+        total = df["Capitalisation Boursière"].sum()
+        df["Part relative (%)"] = df["Capitalisation Boursière"] / total * 100 if total else 0.0
+        return df
+
+
+_building = set()
+_building_lock = threading.Lock()
+
+
+def _build(tickers, max_workers):
+    def compute():
+        infos, failed = fetch_infos(tickers, max_workers=max_workers)
+        index = CompetitorIndex(infos)
+        index.complete = is_complete(infos, failed, tickers)
+        if not index.complete:
+            logger.warning("Index des concurrents incomplet (%d/%d entreprises, %d en échec) : non mis en cache",
+                           len(infos), len(tickers), len(failed))
+        return index
+
+    return PEERS.get_or_compute(tickers, compute, cache_if=lambda index: index.complete)
+
+
+def _build_in_background(tickers, max_workers):
+    with _building_lock:
+        if tickers in _building:
+            return
+        _building.add(tickers)
+
+    def run():
+        try:
+            _build(tickers, max_workers)
+        except Exception:
+            logger.exception("Construction de l'index des concurrents en échec")
+        finally:
+            with _building_lock:
+                _building.discard(tickers)
+
+    threading.Thread(target=run, name="competitor-index", daemon=True).start()
+
+
+def competitor_index(tickers=None, max_workers=16, wait=True):
+    """Index des concurrents sur `tickers` (défaut : tout l'univers suivi), mis en cache.
+
+    Avec `wait=False`, un index absent du cache est construit en arrière-plan et la
+    fonction renvoie tout de suite un index provisoire (`provisional`) sur les
+    fondamentaux déjà en cache, sans appel réseau.
+    """
+    if tickers is None:
+        from .universe import all_tickers
+
+        tickers = all_tickers()
+    tickers = tuple(dict.fromkeys(tickers))
+    if wait:
+        return _build(tickers, max_workers)
+    index = PEERS.get(tickers)
+    if index is not None:
+        return index
+    _build_in_background(tickers, max_workers)
+    infos = {}
+    for ticker in tickers:
+        stale = FUNDAMENTALS.get_stale(normalize_symbol(ticker))
+        if stale is not None and stale[0]:
+            infos[ticker] = stale[0]
+    return CompetitorIndex(infos, provisional=True)
+
+
+def find_competitors(ticker, info=None, k=5, wait=True):
+    """Concurrents les plus proches de `ticker` dans l'univers suivi (voir `CompetitorIndex.competitors`)."""
+    return competitor_index(wait=wait).competitors(ticker, info, k)
@@ -0,0 +1,85 @@
+"""Profilage à la demande de l'affichage d'une page.
+
+Désactivé par défaut : sans demande, `start_profile` ne fait qu'une lecture de variable
+d'environnement. On l'active pour toutes les pages avec `PROFILE=1`, pour certaines avec
+`PROFILE="Comparaison Globale,Le Cas du Jour"`, ou pour un seul affichage avec `?profile=1`
+dans l'URL si l'instance l'autorise (`PROFILE_ALLOW_QUERY=1`) : sinon n'importe quel
+visiteur pourrait faire écrire des profils sur le serveur. Chaque affichage profilé écrit
+un fichier `cProfile` dans `PROFILE_DIR` (défaut : `profiles/`), nommé d'après la page et
+l'heure, à ouvrir avec `python -m pstats`, snakeviz ou un convertisseur en flame graph.
+Seuls les `PROFILE_KEEP` profils les plus récents (50 par défaut) sont gardés.
+
+Seul le thread qui affiche la page est profilé ; les tâches d'arrière-plan ne le sont pas.
+"""
+import datetime
+import glob
+import logging
+import os
+import re
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+TRUE_VALUES = {"1", "true", "yes", "oui", "all"}
+DEFAULT_KEEP = 50
+
+
+def _enabled(name):
+    return os.getenv(name, "").strip().lower() in TRUE_VALUES
+
+
+def profiling_requested(tab, query_value=None):
+    """Vrai si l'affichage de `tab` doit être profilé (variable `PROFILE`, ou paramètre d'URL autorisé)."""
+    if query_value is not None and str(query_value).lower() in TRUE_VALUES and _enabled("PROFILE_ALLOW_QUERY"):
+        return True
+    setting = os.getenv("PROFILE", "").strip()
+    if not setting:
+        return False
+    if setting.lower() in TRUE_VALUES:
+        return True
+    return tab in {name.strip() for name in setting.split(",")}
+
+
+def _slug(text):
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-") or "page"
+
+
+def start_profile(tab, query_value=None):
+    """Démarre un profil de la page `tab` si demandé ; renvoie de quoi l'arrêter, ou None."""
+    if not profiling_requested(tab, query_value):
+        return None
+    import cProfile
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Un autre profileur est déjà actif sur ce thread
+        return None
+    return tab, profiler, datetime.datetime.now()
+
+
+def stop_profile(profile):
+    """Arrête le profil et écrit son fichier ; renvoie le chemin écrit (None sans profil)."""
+    if profile is None:
+        return None
+    tab, profiler, started = profile
+    profiler.disable()
+    directory = os.getenv("PROFILE_DIR", "profiles")
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{_slug(tab)}-{started:%Y%m%d-%H%M%S-%f}.prof")
+    profiler.dump_stats(path)
+    prune(directory)
+    return path
+
+
+def prune(directory, keep=None):
+    """Supprime les profils de `directory` au-delà des `keep` plus récents (`PROFILE_KEEP`)."""
+    keep = int(os.getenv("PROFILE_KEEP", DEFAULT_KEEP)) if keep is None else keep
+    profiles = sorted(glob.glob(os.path.join(directory, "*.prof")), key=os.path.getmtime, reverse=True)
+    for path in profiles[keep:]:
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.warning("Profil %s non supprimé : %s", path, e)
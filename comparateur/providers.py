@@ -0,0 +1,356 @@
+"""Accès aux sources de données externes : Yahoo Finance, Alpha Vantage, Wikipedia et Groq.
+
+Les bibliothèques clientes (yfinance, yahooquery, requests, wikipedia) sont importées
+à l'appel pour que `import comparateur` reste rapide et sans effet de bord.
+Chaque source passe par son disjoncteur (`comparateur.breaker`) ; quand elle est en
+panne, les fonctions mises en cache renvoient leur dernière valeur connue.
+"""
+import contextvars
+import datetime
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import breaker, metrics
+from .cache import ALPHA_VANTAGE, DEAD_SYMBOLS, FUNDAMENTALS, HISTORIES, NEWS, SEARCHES
+from .universe import normalize_symbol
+
+# Adresses par défaut ; `GROQ_BASE_URL` et `ALPHA_VANTAGE_BASE_URL` les remplacent
+# (par exemple par les serveurs locaux de `benchmarks.standin`)
+GROQ_BASE_URL = "https://api.groq.com/openai/v1"
+GROQ_MODEL = "llama3-70b-8192"
+ALPHA_VANTAGE_URL = "https://www.alphavantage.co/query"
+
+
+class GroqError(Exception):
+    """Réponse non 200 de l'API Groq."""
+
+    def __init__(self, status_code, text):
+        super().__init__(f"Erreur Groq : {status_code} - {text}")
+        self.status_code = status_code
+        self.text = text
+
+
+class SymbolNotFoundError(LookupError):
+    """Symbole inconnu ou radié chez Yahoo Finance."""
+
+    def __init__(self, ticker):
+        super().__init__(f"Symbole introuvable ou radié : {ticker}")
+        self.ticker = ticker
+
+
+def _ensure_listed(ticker):
+    """Lève `SymbolNotFoundError` sans appel réseau si le symbole est dans le cache négatif."""
+    if DEAD_SYMBOLS.get(ticker):
+        raise SymbolNotFoundError(ticker)
+
+
+def _not_found(error):
+    message = str(error).lower()
+    return "404" in message or "not found" in message or "delisted" in message
+
+
+def groq_chat_url():
+    return os.getenv("GROQ_BASE_URL", GROQ_BASE_URL).rstrip("/") + "/chat/completions"
+
+
+def alpha_vantage_url():
+    return os.getenv("ALPHA_VANTAGE_BASE_URL", ALPHA_VANTAGE_URL)
+
+
+def _serve_stale(cache, key, source, error):
+    """Dernière valeur en cache de `key` (même expirée) quand la source a échoué, sinon relance `error`."""
+    stale = cache.get_stale(key)
+    if stale is None:
+        raise error
+    value, age = stale
+    source.served_stale(age)
+    return value
+
+
+def search_ticker(query):
+    """Recherche dynamique d'entreprise/ticker via Yahoo Finance (résultats non vides mis en cache)."""
+    def compute():
+        try:
+            from yahooquery import search
+
+            results = metrics.timed("yahoo", "search", search)(query)
+            companies = []
+            for r in results.get('quotes', []):
+                if 'symbol' in r and 'shortname' in r:
+                    companies.append(f"{r['symbol']} - {r['shortname']}")
+            return companies
+        except Exception:
+            return []
+
+    return SEARCHES.get_or_compute(query.strip().lower(), compute, cache_if=bool)
+
+
+def fetch_info(ticker):
+    """Dictionnaire `info` Yahoo Finance d'un ticker (mis en cache).
+
+    Un symbole que Yahoo ne connaît pas est mémorisé dans le cache négatif
+    `DEAD_SYMBOLS` : les appels suivants lèvent `SymbolNotFoundError` immédiatement.
+    """
+    import yfinance as yf
+
+    ticker = normalize_symbol(ticker)
+    _ensure_listed(ticker)
+
+    def compute():
+        try:
+            info = breaker.YAHOO.call(metrics.timed("yahoo", "info", lambda: yf.Ticker(ticker).info),
+                                      is_failure=lambda e: not _not_found(e))
+        except Exception as e:
+            if not _not_found(e):
+                raise
+            info = None
+        if not info or not (info.get("quoteType") or info.get("shortName") or info.get("regularMarketPrice")):
+            DEAD_SYMBOLS.set(ticker, True)
+            raise SymbolNotFoundError(ticker)
+        return info
+
+    try:
+        return FUNDAMENTALS.get_or_compute(ticker, compute)
+    except SymbolNotFoundError:
+        raise
+    except Exception as e:
+        return _serve_stale(FUNDAMENTALS, ticker, breaker.YAHOO, e)
+
+
+def fetch_history(ticker, **kwargs):
+    """Historique de cours Yahoo Finance (mêmes arguments que `Ticker.history`, mis en cache).
+
+    Renvoie un tableau vide pour un symbole du cache négatif.
+    """
+    import pandas as pd
+    import yfinance as yf
+
+    ticker = normalize_symbol(ticker)
+    if DEAD_SYMBOLS.get(ticker):
+        return pd.DataFrame()
+    key = ("history", ticker, tuple(sorted(kwargs.items())))
+    try:
+        history = metrics.timed("yahoo", "history", lambda: yf.Ticker(ticker).history(**kwargs))
+        return HISTORIES.get_or_compute(key, lambda: breaker.YAHOO.call(history),
+                                        cache_if=lambda hist: not hist.empty)
+    except Exception as e:
+        return _serve_stale(HISTORIES, key, breaker.YAHOO, e)
+
+
+def fetch_histories(tickers, **kwargs):
+    """Historiques de plusieurs tickers : un seul `yf.download` groupé pour ceux absents du cache.
+
+    Les historiques téléchargés sont mis en cache par ticker, donc ajouter un ticker à
+    une comparaison ne télécharge que ce ticker. Leurs clés sont distinctes de celles de
+    `fetch_history` : `yf.download` ne renvoie pas les mêmes colonnes que `Ticker.history`.
+    """
+    import pandas as pd
+    import yfinance as yf
+
+    suffix = tuple(sorted(kwargs.items()))
+    symbols = {ticker: normalize_symbol(ticker) for ticker in tickers}
+    histories = {
+        symbol: pd.DataFrame() if DEAD_SYMBOLS.get(symbol) else HISTORIES.get(("download", symbol, suffix))
+        for symbol in symbols.values()
+    }
+    missing = [symbol for symbol, hist in histories.items() if hist is None]
+    if missing:
+        try:
+            data = breaker.YAHOO.call(metrics.timed("yahoo", "download", yf.download), missing,
+                                      group_by="ticker", progress=False, threads=True, **kwargs)
+        except Exception:
+            # Source indisponible : dernières valeurs connues, ou tableau vide
+            for symbol in missing:
+                stale = HISTORIES.get_stale(("download", symbol, suffix))
+                if stale is not None:
+                    breaker.YAHOO.served_stale(stale[1])
+                histories[symbol] = stale[0] if stale is not None else pd.DataFrame()
+            missing = []
+        for symbol in missing:
+            if isinstance(data.columns, pd.MultiIndex):
+                if symbol not in data.columns.get_level_values(0):
+                    histories[symbol] = pd.DataFrame()
+                    continue
+                hist = data[symbol]
+            else:
+                hist = data
+            hist = hist.dropna(how="all")
+            if not hist.empty:
+                HISTORIES.set(("download", symbol, suffix), hist)
+            histories[symbol] = hist
+    return {ticker: histories[symbol] for ticker, symbol in symbols.items()}
+
+
+def fetch_all(fetch, tickers, max_workers=8):
+    """Appelle `fetch(ticker)` en parallèle ; renvoie (résultats, erreurs) indexés par ticker."""
+    results, errors = {}, {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        # Chaque tâche garde le contexte de l'appelant (page en cours pour les métriques)
+        futures = {ticker: pool.submit(contextvars.copy_context().run, fetch, ticker) for ticker in tickers}
+    for ticker, future in futures.items():
+        try:
+            results[ticker] = future.result()
+        except Exception as e:
+            errors[ticker] = e
+    return results, errors
+
+
+def fetch_infos(tickers, max_workers=16):
+    """`info` de plusieurs tickers en parallèle : (infos obtenues, tickers en échec).
+
+    Les symboles inconnus de Yahoo sont simplement absents des infos (ceux déjà dans
+    `DEAD_SYMBOLS` ne sont pas demandés) ; les tickers en échec sont ceux que la source
+    n'a pas pu servir (panne, disjoncteur ouvert).
+    """
+    live = [ticker for ticker in tickers if not DEAD_SYMBOLS.peek(normalize_symbol(ticker))]
+    infos, errors = fetch_all(fetch_info, live, max_workers=max_workers)
+    failed = [ticker for ticker, error in errors.items() if not isinstance(error, SymbolNotFoundError)]
+    return {ticker: infos[ticker] for ticker in live if infos.get(ticker)}, failed
+
+
+def is_complete(infos, failed, tickers, min_coverage=0.9):
+    """Vrai si un index construit sur `infos` peut être mis en cache.
+
+    Un index bâti pendant une panne (tickers en échec, ou moins de `min_coverage` de
+    l'univers demandé) n'est pas gardé : il serait servi incomplet pendant des heures.
+    Les symboles radiés ne comptent pas dans l'univers demandé.
+    """
+    live = sum(1 for ticker in tickers if not DEAD_SYMBOLS.peek(normalize_symbol(ticker)))
+    return not failed and len(infos) >= min_coverage * live
+
+
+def fetch_financials(ticker):
+    """Compte de résultat annuel d'un ticker, lu dans le stockage des comptes (`statements`)."""
+    from .statements import fetch_statement
+
+    return fetch_statement(ticker, "income")
+
+
+def fetch_news(ticker):
+    """Titres (et résumés) des actualités Yahoo Finance récentes d'un ticker (mis en cache)."""
+    import yfinance as yf
+
+    def compute():
+        headlines = []
+        for item in breaker.YAHOO.call(metrics.timed("yahoo", "news", lambda: yf.Ticker(ticker).news)) or []:
+            # yfinance >= 0.2.50 range les champs sous "content"
+            content = item.get("content", item)
+            text = ". ".join(part for part in (content.get("title"), content.get("summary")) if part)
+            if text:
+                headlines.append(text)
+        return headlines
+
+    try:
+        return NEWS.get_or_compute(ticker, compute)
+    except Exception as e:
+        return _serve_stale(NEWS, ticker, breaker.YAHOO, e)
+
+
+def get_alpha_vantage_overview(symbol):
+    """Récupère les données fondamentales Alpha Vantage pour un symbole donné."""
+    api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+    if not api_key:
+        return None
+    data = ALPHA_VANTAGE.get_or_compute(symbol, lambda: _fetch_alpha_vantage_overview(symbol, api_key),
+                                        cache_if=lambda data: data is not None)
+    if data is None and breaker.ALPHA_VANTAGE.state != breaker.CLOSED:
+        stale = ALPHA_VANTAGE.get_stale(symbol)
+        if stale is not None:
+            breaker.ALPHA_VANTAGE.served_stale(stale[1])
+            return stale[0]
+    return data
+
+
+def _fetch_alpha_vantage_overview(symbol, api_key):
+    import requests
+
+    url = f"{alpha_vantage_url()}?function=OVERVIEW&symbol={symbol}&apikey={api_key}"
+
+    def request():
+        r = requests.get(url, timeout=10)
+        r.raise_for_status()
+        data = r.json()
+        # Quota dépassé : Alpha Vantage répond 200 avec un message à la place des données
+        if "Note" in data or "Information" in data:
+            raise RuntimeError(data.get("Note") or data.get("Information"))
+        return data
+
+    try:
+        data = breaker.ALPHA_VANTAGE.call(metrics.timed("alpha_vantage", "overview", request))
+    except Exception:
+        return None
+    return data if "Symbol" in data else None
+
+
+def get_groq_api_key():
+    return os.getenv("GROQ_API_KEY")
+
+
+def groq_chat(prompt, temperature=0.7, max_tokens=500, api_key=None, json_mode=False):
+    """Envoie un prompt à Groq et renvoie le texte de la réponse.
+
+    `json_mode` demande à l'API une réponse qui est un objet JSON valide.
+    Lève `GroqError` si l'API répond avec un statut autre que 200.
+    """
+    import requests
+
+    api_key = api_key or get_groq_api_key()
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json"
+    }
+    payload = {
+        "model": GROQ_MODEL,
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": temperature,
+        "max_tokens": max_tokens
+    }
+    if json_mode:
+        payload["response_format"] = {"type": "json_object"}
+
+    def post():
+        response = requests.post(groq_chat_url(), headers=headers, json=payload, timeout=60)
+        if response.status_code != 200:
+            raise GroqError(response.status_code, response.text)
+        return response.json()["choices"][0]["message"]["content"]
+
+    # Une requête refusée (clé invalide, prompt trop long) ne signale pas une panne de Groq
+    return breaker.GROQ.call(metrics.timed("groq", "chat", post),
+                             is_failure=lambda e: not isinstance(e, GroqError)
+                             or e.status_code >= 500 or e.status_code == 429)
+
+
+def get_random_financial_concept(max_retries=5):
+    """Obtient un concept financier aléatoire à partir de Wikipedia."""
+    import wikipedia
+
+    wikipedia.set_lang("fr")  # Set language to French
+    for attempt in range(max_retries):
+        try:
+            # Get a random page from the "Finance" category
+            random_page = metrics.timed("wikipedia", "random", wikipedia.random)(pages=1)
+            page = metrics.timed("wikipedia", "page", wikipedia.page)(random_page)
+            categories = page.categories
+            if any('finance' in category.lower() or 'économie' in category.lower() for category in categories):
+                return page.title
+
+        except wikipedia.exceptions.DisambiguationError as e:
+            random_page = random.choice(e.options)
+        except wikipedia.exceptions.PageError:
+            continue
+        except Exception as e:
+            if attempt == max_retries - 1:
+                return f"Erreur lors de la récupération du concept: {str(e)}"
+
+        time.sleep(1)  # Add a small delay between attempts
+
+    return "Concept financier non trouvé après plusieurs tentatives"
+
+
+def get_daily_financial_concept():
+    """Obtient le concept financier du jour en utilisant la date comme seed."""
+    today = datetime.date.today()
+    random.seed(int(today.strftime("%Y%m%d")))
+    return get_random_financial_concept()
@@ -0,0 +1,123 @@
+"""Notes financières et potentiel d'investissement calculés à partir d'un dict `info` Yahoo."""
+import logging
+
+from .formatting import format_currency
+
+logger = logging.getLogger(__name__)
+
+
+def _default_warn(message):
+    logger.warning(message)
+
+
+def score_financier(info, warn=None):
+    """Attribue une note financière basée sur divers indicateurs.
+
+    `warn` reçoit les messages d'avertissement (par exemple `st.warning` côté interface) ;
+    par défaut ils sont envoyés au logger du module.
+    """
+    warn = warn or _default_warn
+    score = 0
+    try:
+        revenue = float(info.get("totalRevenue", 0))
+        net_income = float(info.get("netIncomeToCommon", 0))
+        marge_nette = net_income / revenue if revenue > 0 else 0
+        if marge_nette > 0.1:
+            score += 3
+        elif marge_nette > 0.05:
+            score += 2
+        else:
+            score += 1
+    except (TypeError, ValueError):
+        warn("Impossible de calculer la marge nette.")
+
+    try:
+        roe = float(info.get("returnOnEquity", 0))
+        if roe > 0.15:
+            score += 3
+        elif roe > 0.07:
+            score += 2
+        else:
+            score += 1
+    except (TypeError, ValueError):
+        warn("Impossible de calculer le ROE.")
+
+    try:
+        total_debt = float(info.get("totalDebt", 0))
+        equity = float(info.get("totalStockholdersEquity", 1))
+        leverage = total_debt / equity if equity != 0 else 10
+        if leverage < 0.5:
+            score += 2
+        elif leverage < 1.0:
+            score += 1
+    except (TypeError, ValueError):
+        warn("Impossible de calculer le ROE.")
+
+    try:
+        fcf = float(info.get("freeCashflow", 0))
+        if fcf > 0:
+            score += 2
+    except (TypeError, ValueError):
+        warn("Impossible de calculer le flux de trésorerie disponible.")
+
+    return min(score, 10)
+
+
+def assess_investment_potential(info, warn=None):
+    """Assess investment potential based on financial data."""
+    warn = warn or _default_warn
+    potential = 0
+
+    if info.get("returnOnEquity", 0) > 0.15:
+        potential += 3
+    elif info.get("returnOnEquity", 0) > 0.07:
+        potential += 2
+    else:
+        potential += 1
+
+    try:
+        total_debt = float(info.get("totalDebt", 0))
+        equity = float(info.get("totalStockholdersEquity", 1))
+        leverage = total_debt / equity if equity != 0 else 10
+        if leverage < 0.5:
+            potential += 2
+        elif leverage < 1.0:
+            potential += 1
+    except (TypeError, ValueError):
+        warn("Impossible de calculer l'effet de levier.")
+
+    if info.get("profitMargins", 0) > 0.1:
+        potential += 2
+    elif info.get("profitMargins", 0) > 0.05:
+        potential += 1
+
+    return min(potential, 10)
+
+
+def build_company_row(ticker, info, warn=None):
+    """Construit la ligne du tableau de classement pour une entreprise."""
+    company_name = info.get('shortName', ticker)
+    financial_score = score_financier(info, warn=warn)
+
+    # Get relevant financial data
+    revenue_growth = info.get('revenueGrowth', 0)
+    profit_margins = info.get('profitMargins', 0)
+    debt_equity_ratio = info.get('totalDebt', 0) / (info.get('totalStockholdersEquity', 1) or 1)
+    dividend_yield = info.get('dividendYield', 0)
+    pe_ratio = info.get('trailingPE', 0)
+
+    return {
+        "Entreprise": company_name,
+        "Symbole": ticker,
+        "Secteur": info.get("sector", "N/A"),
+        "Industrie": info.get("industry", "N/A"),
+        "Capitalisation Boursière": format_currency(info.get("marketCap")),
+        "ROE": info.get("returnOnEquity", "N/A"),
+        "Marge Bénéficiaire": profit_margins,
+        "Note (sur 10)": financial_score,
+        "Potentiel d'Investissement": assess_investment_potential(info, warn=warn),
+        "Croissance du Chiffre d'Affaires": revenue_growth,
+        "Ratio Dette/Capitaux Propres": debt_equity_ratio,
+        "Rendement des Dividendes": dividend_yield,
+        "Ratio P/E": pe_ratio
+    }
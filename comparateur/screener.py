@@ -0,0 +1,229 @@
+"""Filtre d'actions (screener) sur les fondamentaux en cache de l'univers suivi.
+
+Une requête combine des conditions avec `and` / `et`, par exemple
+`P/E < 15 and ROE > 0.15 and secteur == Technology`. Chaque condition est évaluée
+comme un masque sur une colonne numpy ; les ordres de tri de chaque colonne sont
+calculés une fois à la construction, si bien qu'un filtre suivi d'un top-k ne trie
+plus rien au moment de la requête.
+"""
+import logging
+import math
+import re
+
+from .cache import SCREENERS
+from .providers import fetch_infos, is_complete
+from .scoring import build_company_row
+
+logger = logging.getLogger(__name__)
+
+TEXT_COLUMNS = ["Symbole", "Entreprise", "Secteur", "Industrie", "Pays"]
+NUMERIC_COLUMNS = [
+    "Capitalisation (brute)",
+    "Ratio P/E",
+    "ROE",
+    "Marge Bénéficiaire",
+    "Croissance du Chiffre d'Affaires",
+    "Ratio Dette/Capitaux Propres",
+    "Rendement des Dividendes",
+    "Note (sur 10)",
+]
+
+# Noms acceptés dans les requêtes (en minuscules) -> colonne du tableau
+FIELD_ALIASES = {
+    "symbole": "Symbole", "ticker": "Symbole",
+    "entreprise": "Entreprise", "nom": "Entreprise", "name": "Entreprise",
+    "secteur": "Secteur", "sector": "Secteur",
+    "industrie": "Industrie", "industry": "Industrie",
+    "pays": "Pays", "country": "Pays",
+    "cap": "Capitalisation (brute)", "capitalisation": "Capitalisation (brute)",
+    "marketcap": "Capitalisation (brute)",
+    "pe": "Ratio P/E", "p/e": "Ratio P/E", "per": "Ratio P/E",
+    "roe": "ROE",
+    "marge": "Marge Bénéficiaire", "margin": "Marge Bénéficiaire",
+    "croissance": "Croissance du Chiffre d'Affaires", "growth": "Croissance du Chiffre d'Affaires",
+    "dette": "Ratio Dette/Capitaux Propres", "debt": "Ratio Dette/Capitaux Propres",
+    "d/e": "Ratio Dette/Capitaux Propres",
+    "dividende": "Rendement des Dividendes", "dividend": "Rendement des Dividendes",
+    "yield": "Rendement des Dividendes",
+    "note": "Note (sur 10)", "score": "Note (sur 10)",
+}
+
+# Champs numériques de `info` lus par `build_company_row` ; Yahoo renvoie souvent None
+INFO_NUMERIC_FIELDS = [
+    "marketCap", "trailingPE", "returnOnEquity", "profitMargins", "revenueGrowth", "totalDebt",
+    "totalStockholdersEquity", "dividendYield", "totalRevenue", "netIncomeToCommon", "freeCashflow",
+]
+
+_CONJUNCTION = re.compile(r"\s+(?:and|et)\s+", re.IGNORECASE)
+_CONDITION = re.compile(r"^(.+?)\s*(<=|>=|==|!=|=|<|>)\s*(.+)$")
+_SUFFIXES = {"k": 1e3, "m": 1e6, "b": 1e9, "md": 1e9, "t": 1e12}
+
+
+def _column(name):
+    key = name.strip().lower()
+    if key in FIELD_ALIASES:
+        return FIELD_ALIASES[key]
+    for column in TEXT_COLUMNS + NUMERIC_COLUMNS:
+        if column.lower() == key:
+            return column
+    raise ValueError(f"Champ inconnu dans le filtre : {name.strip()}")
+
+
+def _number(text):
+    match = re.fullmatch(r"(-?[\d.]+(?:e-?\d+)?)\s*(%|k|m|md|b|t)?", text.strip().lower())
+    if not match:
+        raise ValueError(f"Valeur numérique attendue : {text.strip()}")
+    value = float(match.group(1))
+    suffix = match.group(2)
+    if suffix == "%":
+        return value / 100
+    return value * _SUFFIXES.get(suffix, 1)
+
+
+def parse_query(query):
+    """Découpe une requête en conditions (colonne, opérateur, valeur)."""
+    conditions = []
+    for clause in _CONJUNCTION.split(query or ""):
+        if not clause.strip():
+            continue
+        match = _CONDITION.match(clause.strip())
+        if not match:
+            raise ValueError(f"Condition invalide : {clause.strip()}")
+        name, op, raw = match.groups()
+        column = _column(name)
+        op = "==" if op == "=" else op
+        raw = raw.strip().strip("'\"")
+        if column in TEXT_COLUMNS:
+            if op not in ("==", "!="):
+                raise ValueError(f"Seuls == et != s'appliquent à {column}")
+            conditions.append((column, op, raw.lower()))
+        else:
+            conditions.append((column, op, _number(raw)))
+    return conditions
+
+
+def _numeric_info(info):
+    """Copie de `info` où les champs numériques absents ou non numériques valent NaN."""
+    info = dict(info)
+    for field in INFO_NUMERIC_FIELDS:
+        value = info.get(field)
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            info[field] = math.nan
+    return info
+
+
+def fundamentals_table(infos):
+    """Tableau des fondamentaux (une ligne par ticker) à partir d'un dict ticker -> info.
+
+    Un ticker dont les données ne peuvent pas être lues est écarté (et journalisé)
+    sans empêcher la construction du tableau.
+    """
+    import pandas as pd
+
+    rows = []
+    for ticker, info in infos.items():
+        info = _numeric_info(info)
+        try:
+            row = build_company_row(ticker, info, warn=lambda message: None)
+        except Exception as e:
+            logger.warning("Fondamentaux de %s ignorés par le screener : %s", ticker, e)
+            continue
+        row["Pays"] = info.get("country", "N/A")
+        row["Capitalisation (brute)"] = info.get("marketCap")
+        rows.append(row)
+    df = pd.DataFrame(rows, columns=TEXT_COLUMNS + NUMERIC_COLUMNS)
+    df[NUMERIC_COLUMNS] = df[NUMERIC_COLUMNS].apply(pd.to_numeric, errors="coerce")
+    return df
+
+
+class Screener:
+    """Colonnes numpy, masques de filtre et ordres de tri précalculés sur un tableau de fondamentaux."""
+
+    def __init__(self, frame):
+        import numpy as np
+
+        self.frame = frame.reset_index(drop=True)
+        # Faux si des fondamentaux manquaient à la construction (source en panne)
+        self.complete = True
+        self._values = {}
+        self._orders = {}
+        for column in NUMERIC_COLUMNS:
+            values = self.frame[column].to_numpy(dtype=float)
+            ascending = np.argsort(values, kind="stable")  # NaN en dernier
+            valid = int((~np.isnan(values)).sum())
+            self._values[column] = values
+            self._orders[column] = (ascending, np.concatenate([ascending[:valid][::-1], ascending[valid:]]))
+        for column in TEXT_COLUMNS:
+            values = self.frame[column].fillna("").astype(str).str.lower().to_numpy()
+            # Rang alphabétique de chaque ligne, pour trier par lexsort
+            _, codes = np.unique(values, return_inverse=True)
+            self._values[column] = values
+            ascending = np.argsort(codes, kind="stable")
+            self._orders[column] = (ascending, ascending[::-1].copy(), codes)
+
+    def __len__(self):
+        return len(self.frame)
+
+    def mask(self, query):
+        """Masque booléen des lignes qui satisfont toutes les conditions de `query`."""
+        import numpy as np
+
+        mask = np.ones(len(self.frame), dtype=bool)
+        compare = {
+            "<": np.less, "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal,
+            "==": np.equal, "!=": np.not_equal,
+        }
+        for column, op, value in parse_query(query):
+            with np.errstate(invalid="ignore"):
+                mask &= compare[op](self._values[column], value)
+        return mask
+
+    def screen(self, query="", sort_by=None, ascending=True, top=None):
+        """Lignes filtrées par `query`, triées sur une ou plusieurs colonnes, limitées à `top`."""
+        import numpy as np
+
+        mask = self.mask(query)
+        sort_by = [sort_by] if isinstance(sort_by, str) else list(sort_by or [])
+        sort_by = [_column(name) for name in sort_by]
+        directions = [ascending] * len(sort_by) if isinstance(ascending, bool) else list(ascending)
+        if not sort_by:
+            selected = np.flatnonzero(mask)
+        elif len(sort_by) == 1:
+            # Ordre précalculé : on parcourt le tri existant en ne gardant que les lignes retenues
+            order = self._orders[sort_by[0]][0 if directions[0] else 1]
+            selected = order[mask[order]]
+        else:
+            rows = np.flatnonzero(mask)
+            keys = []
+            for column, direction in zip(sort_by, directions):
+                key = self._orders[column][2][rows] if column in TEXT_COLUMNS else self._values[column][rows]
+                keys.append(key if direction else -key)
+            # lexsort trie d'abord sur la dernière clé
+            selected = rows[np.lexsort(keys[::-1])]
+        if top is not None:
+            selected = selected[:top]
+        return self.frame.iloc[selected].reset_index(drop=True)
+
+
+def stock_screener(tickers=None, max_workers=16):
+    """Screener sur `tickers` (défaut : tout l'univers suivi), construit une fois puis mis en cache.
+
+    Un screener construit pendant une panne de la source (`providers.is_complete`) est
+    renvoyé mais pas mis en cache : le prochain affichage le reconstruit.
+    """
+    if tickers is None:
+        from .universe import all_tickers
+
+        tickers = all_tickers()
+    tickers = tuple(dict.fromkeys(tickers))
+
+    def compute():
+        infos, failed = fetch_infos(tickers, max_workers=max_workers)
+        screener = Screener(fundamentals_table(infos))
+        screener.complete = is_complete(infos, failed, tickers)
+        if not screener.complete:
+            logger.warning("Screener incomplet (%d/%d entreprises, %d en échec) : non mis en cache",
+                           len(infos), len(tickers), len(failed))
+        return screener
+
+    return SCREENERS.get_or_compute(tickers, compute, cache_if=lambda screener: screener.complete)
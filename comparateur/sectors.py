@@ -0,0 +1,49 @@
+"""Performance des secteurs américains à partir des historiques des ETF sectoriels.
+
+Les historiques des ETF sont téléchargés en un seul lot et les rendements sur tous les
+horizons sont calculés d'un coup, puis mis en cache pour la journée : afficher le
+graphique ne coûte ensuite plus rien.
+"""
+import datetime
+
+from .cache import SECTORS
+from .comparison import PricePanel
+from .providers import fetch_histories
+from .universe import SECTOR_ETFS
+
+# Libellé -> nombre de mois ; "YTD" part de la dernière clôture de l'année précédente
+HORIZONS = {"1 mois": 1, "3 mois": 3, "6 mois": 6, "YTD": None, "1 an": 12}
+
+
+def returns_frame(panel, horizons=HORIZONS):
+    """Rendements (%) de chaque colonne de `panel` sur chaque horizon (secteurs en lignes)."""
+    import pandas as pd
+
+    last_date = panel.index[-1]
+    cutoffs = {
+        label: (pd.Timestamp(last_date.year - 1, 12, 31) if months is None
+                else last_date - pd.DateOffset(months=months))
+        for label, months in horizons.items()
+    }
+    # Dernière clôture connue à chaque date de départ, tous secteurs confondus
+    starts = panel.reindex(panel.index.union(list(cutoffs.values()))).ffill()
+    bases = starts.loc[list(cutoffs.values())].set_axis(list(cutoffs), axis=0)
+    returns = (panel.iloc[-1] / bases - 1) * 100
+    return returns.T.rename_axis("Secteur")
+
+
+def sector_performance(etfs=None):
+    """Rendements (%) des ETF sectoriels sur 1, 3 et 6 mois, depuis le début de l'année et sur 1 an."""
+    etfs = etfs or SECTOR_ETFS
+    key = (tuple(sorted(etfs.items())), datetime.date.today().isoformat())
+
+    def compute():
+        import pandas as pd
+
+        histories = fetch_histories(list(etfs.values()), period="2y")
+        panel = PricePanel.from_histories(histories, {ticker: sector for sector, ticker in etfs.items()}).closes
+        if panel.empty:
+            return pd.DataFrame(columns=list(HORIZONS))
+        return returns_frame(panel)
+
+    return SECTORS.get_or_compute(key, compute, cache_if=lambda df: not df.empty)
@@ -0,0 +1,201 @@
+"""Sentiment des actualités d'une entreprise avec un modèle financier (FinBERT) sur CPU.
+
+Le modèle est chargé une seule fois par processus ; les textes de tous les tickers
+demandés sont classés ensemble, par lots. Le score d'un ticker (de -1 à 1, moyenne de
+P(positif) - P(négatif) sur ses titres d'actualité, ou à défaut sur sa description)
+est mis en cache pour la journée. Variables d'environnement :
+
+- `SENTIMENT_MODEL` : modèle Hugging Face de classification (défaut : ProsusAI/finbert) ;
+- `SENTIMENT_BATCH_SIZE` : nombre de textes par passage du modèle (défaut : 32) ;
+- `SENTIMENT_STORE` : scores du jour écrits par le job (défaut `data/sentiment.json`,
+  vide : pas de fichier).
+
+Pour scorer tout l'univers en un seul job (une fois par jour, par exemple avec cron) :
+`python -m comparateur.sentiment`. Les pages lisent d'abord ce fichier : seuls les
+tickers absents passent par le modèle.
+"""
+import datetime
+import json
+import logging
+import os
+import threading
+
+from .cache import SENTIMENT
+from .providers import fetch_all, fetch_info, fetch_news
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SENTIMENT_MODEL = "ProsusAI/finbert"
+DEFAULT_STORE = os.path.join("data", "sentiment.json")
+
+# Titres retenus par ticker : les plus récents suffisent pour la jauge
+MAX_TEXTS_PER_TICKER = 20
+
+_instance = None
+_instance_lock = threading.Lock()
+# Contenu du fichier de scores, relu seulement quand il change : (chemin, mtime, scores par jour)
+_stored = (None, None, {})
+
+
+class SentimentModel:
+    """Classifieur de sentiment financier avec inférence par lots."""
+
+    def __init__(self, model_name=DEFAULT_SENTIMENT_MODEL, batch_size=32):
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModelForSequenceClassification.from_pretrained(model_name)
+        self.model.eval()
+        labels = {index: label.lower() for index, label in self.model.config.id2label.items()}
+        self._positive = next(i for i, label in labels.items() if label.startswith("pos"))
+        self._negative = next(i for i, label in labels.items() if label.startswith("neg"))
+        self._lock = threading.Lock()
+
+    def score(self, texts):
+        """Score P(positif) - P(négatif) de chaque texte, entre -1 et 1."""
+        import torch
+
+        scores = []
+        with self._lock, torch.inference_mode():
+            for start in range(0, len(texts), self.batch_size):
+                batch = texts[start:start + self.batch_size]
+                inputs = self.tokenizer(batch, return_tensors="pt", padding=True, truncation=True,
+                                        max_length=256)
+                probs = torch.softmax(self.model(**inputs).logits, dim=-1)
+                scores.extend((probs[:, self._positive] - probs[:, self._negative]).tolist())
+        return scores
+
+
+def get_sentiment_model():
+    """Instance partagée du modèle de sentiment, créée au premier appel."""
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                _instance = SentimentModel(
+                    model_name=os.getenv("SENTIMENT_MODEL", DEFAULT_SENTIMENT_MODEL),
+                    batch_size=int(os.getenv("SENTIMENT_BATCH_SIZE", "32")),
+                )
+    return _instance
+
+
+def store_path():
+    """Fichier des scores du job, ou None si `SENTIMENT_STORE` est vide."""
+    path = os.getenv("SENTIMENT_STORE", DEFAULT_STORE)
+    return path or None
+
+
+def stored_scores(day=None, path=None):
+    """Scores enregistrés par le job pour `day` (défaut : aujourd'hui) : {ticker: score ou None}."""
+    global _stored
+    day = day or datetime.date.today().isoformat()
+    path = path or store_path()
+    if path is None:
+        return {}
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return {}
+    if _stored[:2] != (path, mtime):
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Scores de sentiment illisibles dans %s : %s", path, e)
+            data = {}
+        _stored = (path, mtime, {data.get("date"): data.get("scores", {})})
+    return _stored[2].get(day, {})
+
+
+def save_scores(scores, day=None, path=None):
+    """Écrit les scores du jour (remplacement atomique) ; renvoie False si l'écriture échoue."""
+    day = day or datetime.date.today().isoformat()
+    path = path or store_path()
+    if path is None:
+        return False
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump({"date": day, "scores": scores}, f)
+        os.replace(temporary, path)
+    except OSError as e:
+        logger.warning("Scores de sentiment non enregistrés dans %s : %s", path, e)
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        return False
+    return True
+
+
+def ticker_texts(ticker):
+    """Textes à classer pour un ticker : actualités récentes, sinon description de l'entreprise."""
+    try:
+        texts = fetch_news(ticker)[:MAX_TEXTS_PER_TICKER]
+    except Exception:
+        texts = []
+    if not texts:
+        summary = fetch_info(ticker).get("longBusinessSummary")
+        texts = [summary] if summary else []
+    return texts
+
+
+def sentiment_scores(tickers, max_workers=8):
+    """Score de sentiment du jour par ticker (None si aucun texte), en un seul lot d'inférence.
+
+    Les scores du job (`stored_scores`) et du cache du jour ne repassent pas par le modèle.
+    """
+    today = datetime.date.today().isoformat()
+    stored = stored_scores(today)
+    scores = {}
+    missing = []
+    for ticker in dict.fromkeys(tickers):
+        if ticker in stored:
+            scores[ticker] = stored[ticker]
+            continue
+        cached = SENTIMENT.get((ticker, today))
+        if cached is not None:
+            scores[ticker] = cached
+        else:
+            missing.append(ticker)
+    if not missing:
+        return scores
+
+    texts, _ = fetch_all(ticker_texts, missing, max_workers=max_workers)
+    batch = [(ticker, text) for ticker in missing for text in texts.get(ticker, [])]
+    text_scores = get_sentiment_model().score([text for _, text in batch]) if batch else []
+    by_ticker = {}
+    for (ticker, _), value in zip(batch, text_scores):
+        by_ticker.setdefault(ticker, []).append(value)
+    for ticker in missing:
+        values = by_ticker.get(ticker)
+        if values:
+            scores[ticker] = sum(values) / len(values)
+            SENTIMENT.set((ticker, today), scores[ticker])
+        else:
+            scores[ticker] = None
+    return scores
+
+
+def sentiment_score(ticker):
+    """Score de sentiment du jour d'un ticker, entre -1 et 1 (None si aucun texte)."""
+    return sentiment_scores([ticker])[ticker]
+
+
+def score_universe(max_workers=8):
+    """Scores de sentiment de toutes les entreprises de l'univers suivi, en un seul job.
+
+    Les scores sont enregistrés dans `store_path()`, où les pages les lisent.
+    """
+    from .universe import all_tickers
+
+    tickers = all_tickers()
+    scores = sentiment_scores(tickers, max_workers=max_workers)
+    save_scores(scores)
+    return scores
+
+
+if __name__ == "__main__":
+    for ticker, score in score_universe().items():
+        print(f"{ticker}\t{'N/A' if score is None else f'{score:+.2f}'}")
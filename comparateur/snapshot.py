@@ -0,0 +1,134 @@
+"""Instantané des caches mémoire sur disque, pour redémarrer avec des caches chauds.
+
+Avec `CACHE_SNAPSHOT=chemin/caches.snap`, les caches de `cache.SNAPSHOT_CACHES`
+(fondamentaux, historiques, Alpha Vantage, réponses d'IA, recherches...) sont enregistrés
+toutes les `CACHE_SNAPSHOT_INTERVAL` secondes (600 par défaut) et à l'arrêt du
+processus. Au démarrage suivant, l'instantané est rechargé dans un thread : les pages
+s'affichent tout de suite et profitent des entrées dès qu'elles sont chargées.
+
+Chaque cache est sérialisé à part (pickle compressé) : une entrée illisible ou un cache
+renommé n'empêche pas de restaurer les autres. Les entrées expirées sont gardées pour
+le mode dégradé (`TTLCache.get_stale`).
+"""
+import atexit
+import logging
+import os
+import pickle
+import threading
+import time
+import zlib
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+DEFAULT_INTERVAL = 600
+
+
+def _dumps(cache):
+    """Entrées de `cache` sérialisées, et leur nombre."""
+    entries = cache.snapshot()
+    try:
+        return pickle.dumps(entries, pickle.HIGHEST_PROTOCOL), len(entries)
+    except Exception:
+        # Une valeur non sérialisable ne doit pas priver tout le cache d'instantané
+        kept = []
+        for entry in entries:
+            try:
+                pickle.dumps(entry, pickle.HIGHEST_PROTOCOL)
+            except Exception:
+                continue
+            kept.append(entry)
+        return pickle.dumps(kept, pickle.HIGHEST_PROTOCOL), len(kept)
+
+
+def save(path, caches=None):
+    """Écrit l'instantané de `caches` dans `path` (remplacement atomique) ; renvoie le nombre d'entrées."""
+    from .cache import SNAPSHOT_CACHES
+
+    caches = SNAPSHOT_CACHES if caches is None else caches
+    blobs, count = {}, 0
+    for cache in caches:
+        data, entries = _dumps(cache)
+        blobs[cache.name] = zlib.compress(data, 1)
+        count += entries
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        pickle.dump({"version": FORMAT_VERSION, "created": time.time(), "caches": blobs}, f,
+                    pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary, path)
+    return count
+
+
+def load(path, caches=None):
+    """Restaure dans `caches` les entrées de l'instantané `path` ; renvoie le nombre d'entrées ajoutées."""
+    from .cache import SNAPSHOT_CACHES
+
+    caches = SNAPSHOT_CACHES if caches is None else caches
+    try:
+        with open(path, "rb") as f:
+            payload = pickle.load(f)
+    except FileNotFoundError:
+        return 0
+    except Exception as e:
+        logger.warning("Instantané des caches illisible (%s) : %s", path, e)
+        return 0
+    if payload.get("version") != FORMAT_VERSION:
+        logger.warning("Instantané des caches %s ignoré : format %s", path, payload.get("version"))
+        return 0
+    restored = 0
+    for cache in caches:
+        blob = payload["caches"].get(cache.name)
+        if blob is None:
+            continue
+        try:
+            restored += cache.restore(pickle.loads(zlib.decompress(blob)))
+        except Exception as e:
+            logger.warning("Cache %s non restauré depuis %s : %s", cache.name, path, e)
+    return restored
+
+
+def _save_quietly(path):
+    if not _restored.is_set():
+        # Arrêt avant la fin de la restauration : ne pas écraser l'instantané complet
+        return
+    try:
+        count = save(path)
+        logger.info("%d entrées de cache enregistrées dans %s", count, path)
+    except Exception as e:
+        logger.warning("Instantané des caches non enregistré dans %s : %s", path, e)
+
+
+def _run(path, interval):
+    started = time.monotonic()
+    restored = load(path)
+    if restored:
+        logger.info("%d entrées de cache restaurées depuis %s en %.1f s", restored, path, time.monotonic() - started)
+    _restored.set()
+    while True:
+        time.sleep(interval)
+        _save_quietly(path)
+
+
+_thread = None
+_restored = threading.Event()
+_thread_lock = threading.Lock()
+
+
+def start(path=None, interval=None):
+    """Restaure l'instantané en arrière-plan puis l'enregistre régulièrement et à l'arrêt.
+
+    Une fois par processus ; sans `CACHE_SNAPSHOT` (ni `path`), ne fait rien.
+    """
+    global _thread
+    path = path or os.getenv("CACHE_SNAPSHOT")
+    if not path:
+        return None
+    interval = interval or float(os.getenv("CACHE_SNAPSHOT_INTERVAL", DEFAULT_INTERVAL))
+    with _thread_lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_run, args=(path, interval), name="cache-snapshot", daemon=True)
+            _thread.start()
+            atexit.register(_save_quietly, path)
+        return _thread
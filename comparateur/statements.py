@@ -0,0 +1,182 @@
+"""Comptes annuels par ticker (résultat, bilan, flux de trésorerie), stockés en Parquet.
+
+Yahoo ne modifie ces comptes qu'à la publication des résultats. Une fois téléchargés,
+ils sont relus depuis `STATEMENTS_DIR` (défaut `data/statements`, vide : mémoire
+seulement) jusqu'à la publication suivante : date de résultats des fondamentaux
+(`earningsTimestamp`) plus `PUBLICATION_DELAY`, ou au plus tard après `MAX_AGE` si
+Yahoo n'en donne pas. Chaque téléchargement est fusionné avec les exercices déjà
+stockés : l'historique s'allonge au-delà des quatre ou cinq ans renvoyés par Yahoo.
+
+Un fichier par ticker, au format long (relevé, poste, fin d'exercice, valeur) ;
+`fetch_statement` le remet au format de yfinance (postes en lignes, exercices en
+colonnes, le plus récent en premier).
+"""
+import logging
+import os
+import re
+import time
+
+from . import breaker, metrics
+from .cache import STATEMENTS
+from .universe import normalize_symbol
+
+logger = logging.getLogger(__name__)
+
+# Relevé -> attribut annuel de `yfinance.Ticker`
+STATEMENT_ATTRIBUTES = {"income": "income_stmt", "balance_sheet": "balance_sheet", "cash_flow": "cashflow"}
+COLUMNS = ["statement", "item", "period_end", "value"]
+# Délai entre l'annonce des résultats et la mise à jour des comptes chez Yahoo
+PUBLICATION_DELAY = 3 * 86400
+MAX_AGE = 120 * 86400
+DEFAULT_DIR = os.path.join("data", "statements")
+
+
+def store_dir():
+    """Dossier du stockage, ou None si `STATEMENTS_DIR` est vide (mémoire seulement)."""
+    directory = os.getenv("STATEMENTS_DIR", DEFAULT_DIR)
+    return directory or None
+
+
+def _path(directory, ticker):
+    return os.path.join(directory, re.sub(r"[^A-Za-z0-9._-]", "_", ticker) + ".parquet")
+
+
+def _to_long(statements):
+    """Relevés yfinance (postes x exercices) -> un tableau long trié."""
+    import pandas as pd
+
+    parts = []
+    for name, frame in statements.items():
+        if frame is None or frame.empty:
+            continue
+        long = frame.rename_axis(index="item", columns="period_end").stack().rename("value").reset_index()
+        long.insert(0, "statement", name)
+        parts.append(long)
+    if not parts:
+        return pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in
+                             zip(COLUMNS, ["object", "object", "datetime64[ns]", "float64"])})
+    table = pd.concat(parts, ignore_index=True)
+    table["item"] = table["item"].astype(str)
+    table["period_end"] = pd.to_datetime(table["period_end"]).dt.tz_localize(None).astype("datetime64[ns]")
+    table["value"] = pd.to_numeric(table["value"], errors="coerce")
+    return table.dropna(subset=["value"]).sort_values(COLUMNS[:3], ignore_index=True)
+
+
+def _merge(stored, fetched):
+    """Exercices stockés complétés par le téléchargement (qui l'emporte sur un même exercice)."""
+    import pandas as pd
+
+    if stored is None or stored.empty:
+        return fetched
+    table = pd.concat([stored, fetched], ignore_index=True)
+    table = table.drop_duplicates(subset=COLUMNS[:3], keep="last")
+    return table.sort_values(COLUMNS[:3], ignore_index=True)
+
+
+def is_stale(fetched_at, earnings_at=None, now=None):
+    """Vrai si des résultats ont été publiés (et intégrés par Yahoo) depuis `fetched_at`.
+
+    `earnings_at` : date de résultats des fondamentaux (epoch), passée ou à venir.
+    """
+    now = time.time() if now is None else now
+    if now - fetched_at > MAX_AGE:
+        return True
+    return earnings_at is not None and fetched_at < earnings_at + PUBLICATION_DELAY <= now
+
+
+def load(ticker, directory=None):
+    """(tableau long, date de téléchargement) stockés pour `ticker`, ou None."""
+    import pandas as pd
+
+    directory = directory or store_dir()
+    if directory is None:
+        return None
+    try:
+        table = pd.read_parquet(_path(directory, ticker))
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        # Fichier illisible (écriture interrompue, format changé) : retéléchargé
+        logger.warning("Comptes stockés de %s illisibles : %s", ticker, e)
+        return None
+    return table, float(table.attrs.get("fetched_at", 0))
+
+
+def save(ticker, table, fetched_at, directory=None):
+    """Écrit les comptes de `ticker` (remplacement atomique) ; renvoie False si l'écriture échoue.
+
+    Un stockage impossible (disque plein ou en lecture seule, pyarrow absent) n'est
+    qu'un avertissement : les comptes téléchargés restent servis depuis la mémoire.
+    """
+    directory = directory or store_dir()
+    if directory is None:
+        return False
+    path = _path(directory, ticker)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    table = table.copy()
+    table.attrs["fetched_at"] = fetched_at
+    try:
+        os.makedirs(directory, exist_ok=True)
+        table.to_parquet(temporary, index=False)
+        os.replace(temporary, path)
+    except (OSError, ImportError) as e:
+        logger.warning("Comptes de %s non stockés dans %s : %s", ticker, directory, e)
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+        return False
+    return True
+
+
+def _earnings_at(ticker):
+    from .providers import fetch_info
+
+    try:
+        info = fetch_info(ticker)
+    except Exception:
+        return None
+    return info.get("earningsTimestamp") or info.get("earningsTimestampStart")
+
+
+def _download(ticker):
+    import yfinance as yf
+
+    def download():
+        stock = yf.Ticker(ticker)
+        return {name: getattr(stock, attribute) for name, attribute in STATEMENT_ATTRIBUTES.items()}
+
+    return _to_long(breaker.YAHOO.call(metrics.timed("yahoo", "statements", download)))
+
+
+def _load_or_download(ticker):
+    stored = load(ticker)
+    if stored is not None and not is_stale(stored[1], _earnings_at(ticker)):
+        return stored[0]
+    try:
+        fetched = _download(ticker)
+    except Exception:
+        if stored is None:
+            raise
+        # Source indisponible : les comptes déjà stockés restent valables en attendant
+        breaker.YAHOO.served_stale(time.time() - stored[1])
+        return stored[0]
+    table = _merge(stored[0] if stored else None, fetched)
+    save(ticker, table, time.time())
+    return table
+
+
+def fetch_statements(ticker):
+    """Tous les comptes annuels stockés de `ticker`, au format long (colonnes `COLUMNS`)."""
+    ticker = normalize_symbol(ticker)
+    return STATEMENTS.get_or_compute(ticker, lambda: _load_or_download(ticker))
+
+
+def fetch_statement(ticker, statement="income"):
+    """Un relevé (`income`, `balance_sheet` ou `cash_flow`) : postes en lignes, exercices en colonnes."""
+    if statement not in STATEMENT_ATTRIBUTES:
+        raise ValueError(f"Relevé inconnu : {statement}")
+    table = fetch_statements(ticker)
+    rows = table[table["statement"] == statement]
+    wide = rows.pivot(index="item", columns="period_end", values="value")
+    return wide[sorted(wide.columns, reverse=True)].rename_axis(index=None, columns=None)
@@ -0,0 +1,89 @@
+"""Exécution d'un graphe de tâches : une page déclare ses données et leurs dépendances.
+
+Chaque tâche démarre dès que ses dépendances sont prêtes ; les tâches indépendantes
+tournent en parallèle. La durée d'une page est alors celle de sa plus longue chaîne
+de dépendances, et non la somme de tous les appels.
+
+    graph = TaskGraph()
+    graph.add("infos", fetch_all, args=(fetch_info, tickers))
+    graph.add("histories", fetch_histories, args=(tickers,), kwargs={"period": "1y"})
+    graph.add("prompt", lambda infos: comparison_prompt(infos[0]), deps=["infos"])
+    graph.run()
+    graph.result("prompt")
+"""
+import threading
+from concurrent.futures import Future
+
+from .budget import submit as _submit_background
+
+
+class TaskGraph:
+    """Graphe de tâches nommées ; le résultat de chaque dépendance est passé en argument."""
+
+    def __init__(self, submit=None):
+        self._submit = submit or _submit_background
+        self._tasks = {}
+        self._lock = threading.Lock()
+        self._started = False
+
+    def add(self, name, fn, deps=(), args=(), kwargs=None, submit=None):
+        """Déclare la tâche `name` : `fn(*args, *résultats des deps, **kwargs)`.
+
+        `submit` remplace l'exécuteur du graphe pour cette tâche (ex. `budget.submit_llm`).
+        """
+        if name in self._tasks:
+            raise ValueError(f"Tâche déjà déclarée : {name}")
+        missing = [dep for dep in deps if dep not in self._tasks]
+        if missing:
+            raise ValueError(f"Dépendances inconnues pour {name} : {', '.join(map(str, missing))}")
+        self._tasks[name] = {
+            "fn": fn, "deps": list(deps), "args": tuple(args), "kwargs": kwargs or {},
+            "submit": submit or self._submit, "future": Future(), "scheduled": False,
+        }
+        return self
+
+    def run(self):
+        """Démarre toutes les tâches sans dépendance ; les suivantes partent d'elles-mêmes."""
+        if self._started:
+            return self
+        self._started = True
+        for name, task in self._tasks.items():
+            for dep in task["deps"]:
+                self._tasks[dep]["future"].add_done_callback(lambda _, name=name: self._maybe_schedule(name))
+        for name, task in self._tasks.items():
+            if not task["deps"]:
+                self._maybe_schedule(name)
+        return self
+
+    def future(self, name):
+        return self._tasks[name]["future"]
+
+    def result(self, name, timeout=None):
+        return self.future(name).result(timeout=timeout)
+
+    def _maybe_schedule(self, name):
+        task = self._tasks[name]
+        deps = [self._tasks[dep]["future"] for dep in task["deps"]]
+        with self._lock:
+            if task["scheduled"] or not all(dep.done() for dep in deps):
+                return
+            task["scheduled"] = True
+        failed = next((dep for dep in deps if dep.exception() is not None), None)
+        if failed is not None:
+            # Une dépendance en échec fait échouer toute la chaîne qui en dépend
+            task["future"].set_exception(failed.exception())
+            return
+        task["submit"](self._execute, task, [dep.result() for dep in deps])
+
+    @staticmethod
+    def _execute(task, dep_results):
+        try:
+            result = task["fn"](*task["args"], *dep_results, **task["kwargs"])
+        except BaseException as e:
+            # Le futur est toujours terminé, sinon les dépendants et `result()` attendraient
+            # sans fin ; l'arrêt (st.stop, st.rerun, KeyboardInterrupt) suit ensuite son cours
+            task["future"].set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+        else:
+            task["future"].set_result(result)
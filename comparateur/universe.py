@@ -0,0 +1,424 @@
+"""Univers de tickers : indices boursiers, entreprises par pays, drapeaux et registre normalisé.
+
+`COMPANIES_BY_COUNTRY` et `COUNTRY_TO_COMPANIES` restent les listes saisies à la main ;
+`UNIVERSE` les fusionne en un seul registre indexé, aux symboles normalisés au format
+Yahoo Finance, sans doublon ni symbole radié.
+"""
+
+# Liste des principaux indices boursiers mondiaux
+MARKET_INDEXES = {
+    "S&P 500 (USA)": "^GSPC",
+    "NASDAQ (USA)": "^IXIC",
+    "Dow Jones (USA)": "^DJI",
+    "Russell 2000 (USA)": "^RUT",
+    "CAC 40 (France)": "^FCHI",
+    "DAX (Allemagne)": "^GDAXI",
+    "FTSE 100 (UK)": "^FTSE",
+    "IBEX 35 (Espagne)": "^IBEX",
+    "AEX (Pays-Bas)": "^AEX",
+    "BEL 20 (Belgique)": "^BFX",
+    "SMI (Suisse)": "^SSMI",
+    "FTSE MIB (Italie)": "FTSEMIB.MI",
+    "OMX Stockholm 30 (Suède)": "^OMXS30",
+    "Nikkei 225 (Japon)": "^N225",
+    "TOPIX (Japon)": "^TOPX",
+    "Hang Seng (Hong Kong)": "^HSI",
+    "SSE Composite (Chine)": "000001.SS",
+    "Shenzhen (Chine)": "399001.SZ",
+    "Kospi (Corée du Sud)": "^KS11",
+    "ASX 200 (Australie)": "^AXJO",
+    "BSE Sensex (Inde)": "^BSESN",
+    "Nifty 50 (Inde)": "^NSEI",
+    "TSX (Canada)": "^GSPTSE",
+    "IPC (Mexique)": "^MXX",
+    "Bovespa (Brésil)": "^BVSP",
+    "MERVAL (Argentine)": "^MERV",
+    "TA-35 (Israël)": "TA35.TA",
+    "JSE Top 40 (Afrique du Sud)": "J200.JO",
+    "EGX 30 (Égypte)": "EGX30.CA",
+    "ADX (Abu Dhabi)": "ADXI.AD",
+    "Tadawul (Arabie Saoudite)": "TASI.SR",
+    "RTS (Russie)": "RTSI.ME"
+}
+
+# ETF sectoriels SPDR utilisés comme référence de performance des secteurs américains
+SECTOR_ETFS = {
+    "Technology": "XLK",
+    "Healthcare": "XLV",
+    "Financials": "XLF",
+    "Consumer Discretionary": "XLY",
+    "Consumer Staples": "XLP",
+    "Industrials": "XLI",
+    "Energy": "XLE",
+    "Utilities": "XLU",
+    "Materials": "XLB",
+    "Real Estate": "XLRE",
+    "Communication Services": "XLC"
+}
+
+COMPANIES_BY_COUNTRY = {
+    "États-Unis": [
+        {"ticker": "AAPL", "name": "Apple Inc."},
+        {"ticker": "MSFT", "name": "Microsoft Corporation"},
+        {"ticker": "GOOGL", "name": "Alphabet Inc."},
+        {"ticker": "AMZN", "name": "Amazon.com Inc."},
+        {"ticker": "TSLA", "name": "Tesla Inc."},
+        {"ticker": "META", "name": "Meta Platforms Inc."},
+        {"ticker": "BRK-B", "name": "Berkshire Hathaway Inc."},
+        {"ticker": "NVDA", "name": "NVIDIA Corporation"},
+        {"ticker": "JPM", "name": "JPMorgan Chase & Co."},
+        {"ticker": "V", "name": "Visa Inc."},
+        {"ticker": "UNH", "name": "UnitedHealth Group"},
+        {"ticker": "JNJ", "name": "Johnson & Johnson"},
+        {"ticker": "WMT", "name": "Walmart Inc."},
+        {"ticker": "PG", "name": "Procter & Gamble"},
+        {"ticker": "MA", "name": "Mastercard Inc."},
+        {"ticker": "HD", "name": "Home Depot Inc."},
+        {"ticker": "BAC", "name": "Bank of America"},
+        {"ticker": "DIS", "name": "Walt Disney Co."},
+        {"ticker": "PFE", "name": "Pfizer Inc."},
+        {"ticker": "KO", "name": "Coca-Cola Co."},
+    ],
+    "Chine": [
+        {"ticker": "BABA", "name": "Alibaba Group"},
+        {"ticker": "TCEHY", "name": "Tencent Holdings"},
+        {"ticker": "JD", "name": "JD.com"},
+        {"ticker": "BIDU", "name": "Baidu Inc."},
+        {"ticker": "PDD", "name": "Pinduoduo Inc."},
+        {"ticker": "601318.SS", "name": "Ping An Insurance"},
+        {"ticker": "601857.SS", "name": "PetroChina"},
+        {"ticker": "601398.SS", "name": "ICBC"},
+        {"ticker": "601988.SS", "name": "Bank of China"},
+        {"ticker": "601939.SS", "name": "China Construction Bank"},
+        {"ticker": "600028.SS", "name": "Sinopec"},
+        {"ticker": "600519.SS", "name": "Kweichow Moutai"},
+        {"ticker": "000001.SZ", "name": "Ping An Bank"},
+        {"ticker": "000333.SZ", "name": "Midea Group"},
+        {"ticker": "000651.SZ", "name": "Gree Electric"},
+        {"ticker": "002594.SZ", "name": "BYD Company"},
+        {"ticker": "00700.HK", "name": "Tencent Holdings (HK)"},
+        {"ticker": "02318.HK", "name": "Ping An Insurance (HK)"},
+        {"ticker": "00941.HK", "name": "China Mobile"},
+        {"ticker": "03988.HK", "name": "Bank of China (HK)"},
+    ],
+    "Japon": [
+        {"ticker": "7203.T", "name": "Toyota Motor"},
+        {"ticker": "6758.T", "name": "Sony Group"},
+        {"ticker": "9984.T", "name": "SoftBank Group"},
+        {"ticker": "8306.T", "name": "Mitsubishi UFJ Financial"},
+        {"ticker": "7267.T", "name": "Honda Motor"},
+        {"ticker": "9432.T", "name": "NTT"},
+        {"ticker": "8035.T", "name": "Tokyo Electron"},
+        {"ticker": "6861.T", "name": "Keyence"},
+        {"ticker": "7974.T", "name": "Nintendo"},
+        {"ticker": "6902.T", "name": "Denso"},
+        {"ticker": "8766.T", "name": "Tokio Marine"},
+        {"ticker": "4502.T", "name": "Takeda Pharmaceutical"},
+        {"ticker": "8411.T", "name": "Mizuho Financial"},
+        {"ticker": "6098.T", "name": "Recruit Holdings"},
+        {"ticker": "7751.T", "name": "Canon Inc."},
+        {"ticker": "8058.T", "name": "Mitsubishi Corporation"},
+        {"ticker": "9433.T", "name": "KDDI Corporation"},
+        {"ticker": "4661.T", "name": "Oriental Land"},
+        {"ticker": "5108.T", "name": "Bridgestone"},
+        {"ticker": "6501.T", "name": "Hitachi"},
+    ],
+    "Allemagne": [
+        {"ticker": "SAP.DE", "name": "SAP SE"},
+        {"ticker": "ALV.DE", "name": "Allianz SE"},
+        {"ticker": "BAS.DE", "name": "BASF SE"},
+        {"ticker": "BAYN.DE", "name": "Bayer AG"},
+        {"ticker": "BMW.DE", "name": "BMW AG"},
+        {"ticker": "DAI.DE", "name": "Mercedes-Benz Group"},
+        {"ticker": "DBK.DE", "name": "Deutsche Bank"},
+        {"ticker": "DTE.DE", "name": "Deutsche Telekom"},
+        {"ticker": "FRE.DE", "name": "Fresenius SE"},
+        {"ticker": "HEI.DE", "name": "HeidelbergCement"},
+        {"ticker": "HEN3.DE", "name": "Henkel AG"},
+        {"ticker": "IFX.DE", "name": "Infineon Technologies"},
+        {"ticker": "LHA.DE", "name": "Lufthansa"},
+        {"ticker": "LIN.DE", "name": "Linde plc"},
+        {"ticker": "MRK.DE", "name": "Merck KGaA"},
+        {"ticker": "MUV2.DE", "name": "Munich Re"},
+        {"ticker": "RWE.DE", "name": "RWE AG"},
+        {"ticker": "SIE.DE", "name": "Siemens AG"},
+        {"ticker": "VOW3.DE", "name": "Volkswagen AG"},
+        {"ticker": "ZAL.DE", "name": "Zalando SE"},
+    ],
+    "Inde": [
+        {"ticker": "RELIANCE.NS", "name": "Reliance Industries"},
+        {"ticker": "TCS.NS", "name": "Tata Consultancy Services"},
+        {"ticker": "HDFCBANK.NS", "name": "HDFC Bank"},
+        {"ticker": "INFY.NS", "name": "Infosys"},
+        {"ticker": "ICICIBANK.NS", "name": "ICICI Bank"},
+        {"ticker": "HINDUNILVR.NS", "name": "Hindustan Unilever"},
+        {"ticker": "SBIN.NS", "name": "State Bank of India"},
+        {"ticker": "BHARTIARTL.NS", "name": "Bharti Airtel"},
+        {"ticker": "KOTAKBANK.NS", "name": "Kotak Mahindra Bank"},
+        {"ticker": "ITC.NS", "name": "ITC Limited"},
+        {"ticker": "LT.NS", "name": "Larsen & Toubro"},
+        {"ticker": "AXISBANK.NS", "name": "Axis Bank"},
+        {"ticker": "BAJFINANCE.NS", "name": "Bajaj Finance"},
+        {"ticker": "MARUTI.NS", "name": "Maruti Suzuki"},
+        {"ticker": "SUNPHARMA.NS", "name": "Sun Pharma"},
+        {"ticker": "ASIANPAINT.NS", "name": "Asian Paints"},
+        {"ticker": "ULTRACEMCO.NS", "name": "UltraTech Cement"},
+        {"ticker": "TITAN.NS", "name": "Titan Company"},
+        {"ticker": "WIPRO.NS", "name": "Wipro"},
+        {"ticker": "ONGC.NS", "name": "ONGC"},
+    ],
+    "Royaume-Uni": [
+        {"ticker": "HSBA.L", "name": "HSBC Holdings"},
+        {"ticker": "AZN.L", "name": "AstraZeneca"},
+        {"ticker": "SHEL.L", "name": "Shell plc"},
+        {"ticker": "GSK.L", "name": "GSK plc"},
+        {"ticker": "ULVR.L", "name": "Unilever"},
+        {"ticker": "BP.L", "name": "BP plc"},
+        {"ticker": "RIO.L", "name": "Rio Tinto"},
+        {"ticker": "BATS.L", "name": "British American Tobacco"},
+        {"ticker": "DGE.L", "name": "Diageo"},
+        {"ticker": "LSEG.L", "name": "London Stock Exchange"},
+        {"ticker": "BARC.L", "name": "Barclays"},
+        {"ticker": "VOD.L", "name": "Vodafone Group"},
+        {"ticker": "NG.L", "name": "National Grid"},
+        {"ticker": "PRU.L", "name": "Prudential"},
+        {"ticker": "LLOY.L", "name": "Lloyds Banking Group"},
+        {"ticker": "SMIN.L", "name": "Smiths Group"},
+        {"ticker": "AAL.L", "name": "Anglo American"},
+        {"ticker": "TSCO.L", "name": "Tesco"},
+        {"ticker": "IMB.L", "name": "Imperial Brands"},
+        {"ticker": "SGE.L", "name": "Sage Group"},
+    ],
+    "France": [
+        {"ticker": "MC.PA", "name": "LVMH Moët Hennessy Louis Vuitton"},
+        {"ticker": "OR.PA", "name": "L'Oréal"},
+        {"ticker": "SAN.PA", "name": "Sanofi"},
+        {"ticker": "AIR.PA", "name": "Airbus"},
+        {"ticker": "BNP.PA", "name": "BNP Paribas"},
+        {"ticker": "ENGI.PA", "name": "Engie"},
+        {"ticker": "CAP.PA", "name": "Capgemini"},
+        {"ticker": "RMS.PA", "name": "Hermès International"},
+        {"ticker": "TTE.PA", "name": "TotalEnergies SE"},
+        {"ticker": "DG.PA", "name": "Danone"},
+        {"ticker": "VIE.PA", "name": "Veolia Environnement"},
+        {"ticker": "GLE.PA", "name": "Société Générale"},
+        {"ticker": "AC.PA", "name": "Accor SA"},
+        {"ticker": "KER.PA", "name": "Kering SA"},
+        {"ticker": "EDF.PA", "name": "Électricité de France (EDF)"},
+        {"ticker": "SU.PA", "name": "Schneider Electric SE"},
+        {"ticker": "VIV.PA", "name": "Vivendi SE"},
+        {"ticker": "STLA.PA", "name": "Stellantis NV"},
+        {"ticker": "PUB.PA", "name": "Publicis Groupe SA"},
+    ],
+    "Italie": [
+        {"ticker": "ENI.MI", "name": "Eni S.p.A."},
+        {"ticker": "ISP.MI", "name": "Intesa Sanpaolo"},
+        {"ticker": "UCG.MI", "name": "UniCredit S.p.A."},
+        {"ticker": "FCA.MI", "name": "Fiat Chrysler Automobiles"},
+        {"ticker": "LUX.MI", "name": "Luxottica Group"},
+        {"ticker": "SFER.MI", "name": "Salvatore Ferragamo"},
+        {"ticker": "ATL.MI", "name": "Atlantia S.p.A."},
+        {"ticker": "G.MI", "name": "Generali Group"},
+        {"ticker": "ENEL.MI", "name": "Enel S.p.A."},
+        {"ticker": "STLA.MI", "name": "Stellantis NV (Italian listing)"},
+    ],
+    "Canada": [
+        {"ticker": "RY.TO", "name": "Royal Bank of Canada"},
+        {"ticker": "TD.TO", "name": "Toronto-Dominion Bank"},
+        {"ticker": "BNS.TO", "name": "Bank of Nova Scotia"},
+        {"ticker": "CM.TO", "name": "Canadian Imperial Bank of Commerce"},
+        {"ticker": "ENB.TO", "name": "Enbridge Inc."},
+        {"ticker": "TRP.TO", "name": "TC Energy Corporation"},
+        {"ticker": "BMO.TO", "name": "Bank of Montreal"},
+        {"ticker": "SU.TO", "name": "Suncor Energy Inc."},
+        {"ticker": "CNQ.TO", "name": "Canadian Natural Resources Limited"},
+        {"ticker": "CP.TO", "name": "Canadian Pacific Railway Limited"},
+        {"ticker": "SHOP.TO", "name": "Shopify Inc."},
+        {"ticker": "BAM-A.TO", "name": "Brookfield Asset Management Inc."},
+        {"ticker": "ABX.TO", "name": "Barrick Gold Corporation"},
+        {"ticker": "CNR.TO", "name": "Canadian National Railway Company"},
+        {"ticker": "ATD-B.TO", "name": "Alimentation Couche-Tard Inc."},
+    ],
+    "Corée du Sud": [
+        {"ticker": "005930.KS", "name": "Samsung Electronics"},
+        {"ticker": "000660.KS", "name": "SK Hynix"},
+        {"ticker": "051910.KS", "name": "LG Chem"},
+        {"ticker": "005380.KS", "name": "Hyundai Motor"},
+        {"ticker": "035420.KS", "name": "Naver Corporation"},
+        {"ticker": "005490.KS", "name": "POSCO Holdings"},
+        {"ticker": "068270.KS", "name": "Celltrion"},
+        {"ticker": "017670.KS", "name": "KT Corporation"},
+        {"ticker": "012330.KS", "name": "Samsung Biologics"},
+        {"ticker": "096770.KS", "name": "Kakao Corp."},
+    ]
+}
+
+# List of 10 largest countries by GDP (replace with actual data)
+TOP_10_COUNTRIES = [
+    "United States", "China", "Japan", "Germany", "India",
+    "United Kingdom", "France", "Italy", "Canada", "South Korea"
+]
+
+# Mapping of country to a list of major companies (replace with actual data)
+COUNTRY_TO_COMPANIES = {
+    "United States": ["AAPL", "MSFT", "AMZN", "GOOGL", "BRK.B", "JPM", "V", "UNH", "JNJ", "XOM"],
+    "China": ["BABA", "TCEHY", "JD", "BIDU", "PDD", "0941.HK", "601398.SS", "601288.SS", "601939.SS", "00700.HK"],
+    "Japan": ["7203.T", "6758.T", "9984.T", "8306.T", "6954.T", "8316.T", "8031.T", "8766.T", "8604.T", "6501.T"],
+    "Germany": ["VOW.DE", "SAP.DE", "SIE.DE", "BMW.DE", "ALV.DE", "DTE.DE", "BAYN.DE", "MBG.DE", "BAS.DE", "ADS.DE"],
+    "India": ["RELIANCE.NS", "HDFCBANK.NS", "INFY.NS", "TCS.NS", "ICICIBANK.NS", "HDFC.NS", "SBIN.NS", "BHARTIARTL.NS", "LT.NS", "KOTAKBANK.NS"],
+    "United Kingdom": ["SHEL.L", "HSBA.L", "AZN.L", "BP.L", "ULVR.L", "RIO.L", "GSK.L", "BATS.L", "DGE.L", "LSEG.L"],
+    "France": ["LVMH.PA", "OR.PA", "SAN.PA", "RMS.PA", "TTE.PA", "MC.PA", "KER.PA", "CAP.PA", "BNP.PA", "GLE.PA"],
+    "Italy": ["ENI.MI", "UCG.MI", "ISP.MI", "STM.MI", "G.MI", "ATL.MI", "SRG.MI", "RACE.MI", "PRY.MI", "MB.MI"],
+    "Canada": ["RY.TO", "TD.TO", "CM.TO", "BMO.TO", "ENB.TO", "BNS.TO", "CP.TO", "CNR.TO", "TRP.TO", "BCE.TO"],
+    "South Korea": ["005930.KS", "000660.KS", "051910.KS", "005380.KS", "035420.KS", "005490.KS", "068270.KS", "017670.KS", "012330.KS", "096770.KS"]
+}
+
+# Mapping of country to flag emoji
+COUNTRY_FLAGS = {
+    "United States": "🇺🇸",
+    "China": "🇨🇳",
+    "Japan": "🇯🇵",
+    "Germany": "🇩🇪",
+    "India": "🇮🇳",
+    "United Kingdom": "🇬🇧",
+    "France": "🇫🇷",
+    "Italy": "🇮🇹",
+    "Canada": "🇨🇦",
+    "South Korea": "🇰🇷"
+}
+
+
+# Noms français des pays, tels qu'affichés dans `COMPANIES_BY_COUNTRY`
+COUNTRY_LABELS_FR = {
+    "United States": "États-Unis",
+    "China": "Chine",
+    "Japan": "Japon",
+    "Germany": "Allemagne",
+    "India": "Inde",
+    "United Kingdom": "Royaume-Uni",
+    "France": "France",
+    "Italy": "Italie",
+    "Canada": "Canada",
+    "South Korea": "Corée du Sud"
+}
+
+# Suffixe Yahoo Finance -> place de cotation
+EXCHANGES = {
+    "": {"exchange": "NYSE / NASDAQ", "country": "United States", "currency": "USD"},
+    "SS": {"exchange": "Shanghai", "country": "China", "currency": "CNY"},
+    "SZ": {"exchange": "Shenzhen", "country": "China", "currency": "CNY"},
+    "HK": {"exchange": "Hong Kong", "country": "China", "currency": "HKD"},
+    "T": {"exchange": "Tokyo", "country": "Japan", "currency": "JPY"},
+    "DE": {"exchange": "Xetra", "country": "Germany", "currency": "EUR"},
+    "NS": {"exchange": "NSE", "country": "India", "currency": "INR"},
+    "L": {"exchange": "Londres", "country": "United Kingdom", "currency": "GBp"},
+    "PA": {"exchange": "Euronext Paris", "country": "France", "currency": "EUR"},
+    "MI": {"exchange": "Borsa Italiana", "country": "Italy", "currency": "EUR"},
+    "TO": {"exchange": "Toronto", "country": "Canada", "currency": "CAD"},
+    "KS": {"exchange": "KRX", "country": "South Korea", "currency": "KRW"}
+}
+
+# Classes d'actions américaines, notées `BRK.B` ailleurs mais `BRK-B` chez Yahoo
+SHARE_CLASSES = {"A", "B", "C"}
+
+# Anciens symboles -> symbole actuel (fusions, changements de nom, doubles classes)
+SYMBOL_ALIASES = {
+    "LVMH.PA": "MC.PA",
+    "HDFC.NS": "HDFCBANK.NS",
+    "DAI.DE": "MBG.DE",
+    "FCA.MI": "STLA.MI",
+    "LIN.DE": "LIN",
+    "ATD-B.TO": "ATD.TO",
+    "BAM-A.TO": "BN.TO"
+}
+
+# Symboles radiés sans successeur coté : jamais interrogés
+DELISTED_SYMBOLS = {"ATL.MI", "EDF.PA", "LUX.MI"}
+
+
+def normalize_symbol(symbol):
+    """Symbole au format Yahoo Finance : majuscules, classe d'action avec un tiret
+    (`BRK.B` -> `BRK-B`), codes de Hong Kong sur 4 chiffres, alias des anciens symboles."""
+    symbol = (symbol or "").strip().upper()
+    base, dot, suffix = symbol.rpartition(".")
+    if dot and suffix in SHARE_CLASSES and base.isalpha():
+        symbol = f"{base}-{suffix}"
+    elif suffix == "HK" and base.isdigit():
+        symbol = f"{int(base):04d}.HK"
+    return SYMBOL_ALIASES.get(symbol, symbol)
+
+
+def exchange_info(symbol):
+    """Place de cotation, pays et devise d'un symbole, d'après son suffixe."""
+    base, dot, suffix = normalize_symbol(symbol).rpartition(".")
+    return EXCHANGES.get(suffix if dot else "", EXCHANGES[""])
+
+
+class UniverseRegistry:
+    """Registre des entreprises suivies, indexé par symbole normalisé et par pays."""
+
+    def __init__(self, listings):
+        self._listings = {}
+        self._by_country = {}
+        self._aliased = set()
+        for country, symbol, name in listings:
+            raw = symbol.strip().upper()
+            ticker = normalize_symbol(raw)
+            if raw in DELISTED_SYMBOLS or ticker in DELISTED_SYMBOLS:
+                continue
+            listing = self._listings.get(ticker)
+            if listing is None:
+                self._listings[ticker] = {
+                    **exchange_info(ticker),
+                    "symbol": ticker,
+                    "name": name or ticker,
+                    "country": country,
+                    "country_label": COUNTRY_LABELS_FR.get(country, country),
+                }
+                self._by_country.setdefault(country, []).append(ticker)
+                if ticker != raw:
+                    self._aliased.add(ticker)
+            elif name and (listing["name"] == ticker or (ticker in self._aliased and ticker == raw)):
+                # Le nom saisi sous le symbole actuel prime sur celui d'un ancien symbole
+                listing["name"] = name
+                self._aliased.discard(ticker)
+
+    def __contains__(self, symbol):
+        return normalize_symbol(symbol) in self._listings
+
+    def __len__(self):
+        return len(self._listings)
+
+    def get(self, symbol):
+        """Fiche d'un symbole (nom, pays, place, devise) ou None s'il n'est pas suivi."""
+        return self._listings.get(normalize_symbol(symbol))
+
+    def countries(self):
+        return list(self._by_country)
+
+    def tickers(self, country=None):
+        """Symboles suivis (d'un pays, ou de tout l'univers), dans un ordre fixe.
+
+        La liste ne dépend pas des symboles découverts radiés en cours de route : elle
+        sert de clé aux index (`PEERS`, `SCREENERS`) et au choix du Cas du Jour. Les
+        symboles radiés sont écartés au moment des appels (`providers.fetch_infos`).
+        """
+        return list(self._by_country.get(country, [])) if country else list(self._listings)
+
+
+def _listings():
+    countries = {label: country for country, label in COUNTRY_LABELS_FR.items()}
+    for label, companies in COMPANIES_BY_COUNTRY.items():
+        for company in companies:
+            yield countries.get(label, label), company["ticker"], company.get("name")
+    for country, tickers in COUNTRY_TO_COMPANIES.items():
+        for ticker in tickers:
+            yield country, ticker, None
+
+
+UNIVERSE = UniverseRegistry(_listings())
+
+
+def all_tickers():
+    """Tous les tickers suivis, normalisés et sans doublon."""
+    return UNIVERSE.tickers()
@@ -0,0 +1,38 @@
+"""Point d'entrée de production : l'application Streamlit et ses fichiers d'application installable.
+
+    streamlit run server.py
+
+Le service worker (`static/sw.js`) est servi à la racine (`/sw.js`) : sa portée couvre
+alors la page de l'application, dont il sert la dernière version en cache hors ligne.
+Streamlit réserve `/static/` à ses propres fichiers ; le manifeste et les icônes de
+`static/` sont donc servis sous `/pwa/`. `PWA_ROUTES` signale à app.py que ces routes
+existent ; `streamlit run app.py` reste possible, sans application installable (ni
+service worker ni manifeste enregistrés).
+"""
+import os
+
+import streamlit as st
+from starlette.responses import FileResponse, Response
+from starlette.routing import Route
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+PWA_FILES = {"manifest.json", "icon-192.png", "icon-512.png"}
+
+
+async def service_worker(request):
+    # Revalidé à chaque visite : une nouvelle version est installée dès son déploiement
+    return FileResponse(os.path.join(STATIC_DIR, "sw.js"), media_type="text/javascript",
+                        headers={"Cache-Control": "no-cache", "Service-Worker-Allowed": "/"})
+
+
+async def pwa_file(request):
+    name = request.path_params["name"]
+    if name not in PWA_FILES:
+        return Response(status_code=404)
+    return FileResponse(os.path.join(STATIC_DIR, name))
+
+
+# Lu par app.py, exécuté dans ce même processus
+os.environ["PWA_ROUTES"] = "1"
+
+app = st.App("app.py", routes=[Route("/sw.js", service_worker), Route("/pwa/{name}", pwa_file)])
@@ -1,8 +1,96 @@
+// Service worker de l'application installable (manifest.json).
+//
+// Servi à la racine (/sw.js, voir server.py) et enregistré avec la portée « / » : sans
+// cela sa portée serait /static/ et il ne verrait jamais la page de l'application.
+//
+// - Icônes et manifeste (/pwa/), fichiers de Streamlit sous /static/ (noms contenant un
+//   hash) : précachés à l'installation puis servis depuis le cache (cache d'abord).
+// - Page de l'application (navigation) : réseau d'abord, dernière version en cache si
+//   le serveur ne répond pas.
+// - Tout le reste (/_stcore/ : WebSocket, santé, configuration ; autres domaines) passe
+//   directement au réseau.
+//
+// Changer VERSION à chaque modification des fichiers de ce dossier : les anciens caches
+// sont supprimés à l'activation du nouveau service worker.
+const VERSION = "v3";
+const STATIC_CACHE = `comparateur-static-${VERSION}`;
+const SHELL_CACHE = `comparateur-shell-${VERSION}`;
+const SHELL_URL = "/";
+const PRECACHE = [
+  "/pwa/manifest.json",
+  "/pwa/icon-192.png",
+  "/pwa/icon-512.png",
+];
+// Fichiers de Streamlit référencés par la page : <script src> et <link href> sous /static/
+const BUNDLE_PATTERN = /(?:src|href)="\.?(\/static\/[^"]+)"/g;
+
+async function precache() {
+  const cache = await caches.open(STATIC_CACHE);
+  try {
+    await cache.addAll(PRECACHE);
+    const response = await fetch(SHELL_URL, { cache: "no-cache" });
+    if (!response.ok) return;
+    const html = await response.clone().text();
+    await caches.open(SHELL_CACHE).then(shell => shell.put(SHELL_URL, response));
+    const bundles = [...html.matchAll(BUNDLE_PATTERN)].map(match => match[1]);
+    await cache.addAll([...new Set(bundles)].filter(url => !PRECACHE.includes(url)));
+  } catch (error) {
+    // Hors ligne à l'installation : les fichiers manquants sont mis en cache au premier accès
+    console.log("Précache partiel :", error);
+  }
+}
+
+async function cacheFirst(request) {
+  const cached = await caches.match(request, { cacheName: STATIC_CACHE });
+  if (cached) return cached;
+  const response = await fetch(request);
+  if (response.ok) {
+    const cache = await caches.open(STATIC_CACHE);
+    cache.put(request, response.clone());
+  }
+  return response;
+}
+
+async function networkFirst(request) {
+  try {
+    const response = await fetch(request);
+    if (response.ok) {
+      const cache = await caches.open(SHELL_CACHE);
+      cache.put(SHELL_URL, response.clone());
+    }
+    return response;
+  } catch (error) {
+    const cached = await caches.match(SHELL_URL, { cacheName: SHELL_CACHE });
+    if (cached) return cached;
+    throw error;
+  }
+}
+
 self.addEventListener("install", event => {
-  console.log("Service worker installed.");
-  self.skipWaiting();
+  event.waitUntil(precache().then(() => self.skipWaiting()));
+});
+
+self.addEventListener("activate", event => {
+  const current = [STATIC_CACHE, SHELL_CACHE];
+  event.waitUntil(
+    caches.keys()
+      .then(keys => Promise.all(
+        keys.filter(key => key.startsWith("comparateur-") && !current.includes(key))
+          .map(key => caches.delete(key))
+      ))
+      .then(() => self.clients.claim())
+  );
 });
 
 self.addEventListener("fetch", event => {
-  event.respondWith(fetch(event.request));
+  const request = event.request;
+  if (request.method !== "GET") return;
+  const url = new URL(request.url);
+  if (url.origin !== self.location.origin) return;
+  if (request.mode === "navigate") {
+    event.respondWith(networkFirst(request));
+  } else if (url.pathname.startsWith("/static/") || url.pathname.startsWith("/pwa/")) {
+    event.respondWith(cacheFirst(request));
+  }
+  // Sans respondWith, le navigateur traite la requête lui-même, sans surcoût
 });